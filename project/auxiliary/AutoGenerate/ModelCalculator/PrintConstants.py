@@ -3,7 +3,7 @@ from constants import PRECISION
 
 import sys
 sys.path.append('../../Tests')
-from Common.ModelDataSource import intervalLists
+from Common.IntervalTable import intervalLists
 
 
 FIXED_ONE = 2**PRECISION
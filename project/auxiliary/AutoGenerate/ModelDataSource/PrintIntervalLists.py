@@ -1,6 +1,6 @@
 import sys
 sys.path.append('../../Tests')
-from Common.ModelDataSource import intervalLists
+from Common.IntervalTable import intervalLists
 
 
 max_minN  = 0
@@ -0,0 +1,9 @@
+import sys
+sys.path.append('../../Tests')
+from Common.ModelDataSource import intervalLists
+from Common.IntervalTable import write
+
+
+fileName = sys.argv[1] if len(sys.argv) > 1 else 'IntervalTable.bin'
+with open(fileName,'wb') as fileDesc:
+    write(fileDesc,intervalLists)
@@ -3,7 +3,7 @@ from fractions import Fraction
 
 import sys
 sys.path.append('../../Tests')
-from Common.ModelDataSource import intervalLists
+from Common.IntervalTable import intervalLists
 
 A_B = intervalLists[ 0][0][4]
 
@@ -8,7 +8,7 @@ from fractions import Fraction
 
 import sys
 sys.path.append('../../Tests')
-from Common.ModelDataSource import intervalLists
+from Common.IntervalTable import intervalLists
 
 
 oneToken = 10**denomination
@@ -1,9 +1,93 @@
+from copy import copy, deepcopy
+from ContractAddressLocatorHolder import ContractAddressLocatorHolder
+
+
+class Registry(dict):
+    '''
+        Hold the components which have not been retrieved since the registry was forked
+        Such a component is copied (and rewired to the given locator) when it is first retrieved
+    '''
+    def __init__(self, _contractAddressLocator):
+        super().__init__()
+        self.contractAddressLocator = _contractAddressLocator
+        self.origins = {}
+
+    def __missing__(self, _identifier):
+        contractAddress = self.contractAddressLocator.clone(self.origins.pop(_identifier))
+        self[_identifier] = contractAddress
+        if self.contractAddressLocator.bound:
+            self.contractAddressLocator.resolve(contractAddress)
+        return contractAddress
+
+    def __contains__(self, _identifier):
+        return super().__contains__(_identifier) or _identifier in self.origins
+
+
 class ContractAddressLocator:
     def __init__(self):
-        self.registry = {}
+        self.registry = Registry(self)
+        self.bound = False
 
     def set(self, _identifier, _contractAddress):
+        self.registry.origins.pop(_identifier, None)
         self.registry[_identifier] = _contractAddress
+        if self.bound:
+            for contractAddress in self.registry.values():
+                self.resolve(contractAddress, _identifier)
+            self.resolve(_contractAddress)
 
     def get(self, _identifier):
         return self.registry[_identifier]
+
+    '''
+        Resolve the dependencies of every registered component into direct attributes
+        From now on, every call to 'set' re-resolves the components which depend on the given identifier
+    '''
+    def bind(self):
+        self.bound = True
+        for contractAddress in list(self.registry.values()):
+            self.resolve(contractAddress)
+
+    '''
+        Dependencies which have not been copied since the registry was forked are resolved upon first access
+    '''
+    def resolve(self, _contractAddress, _identifier=None):
+        if isinstance(_contractAddress, ContractAddressLocatorHolder) and _contractAddress.__dict__.get('contractAddressLocator') is self:
+            for name, identifier in type(_contractAddress).dependencies.items():
+                if _identifier in (None, identifier):
+                    if dict.__contains__(self.registry, identifier):
+                        _contractAddress.__dict__[name] = self.registry[identifier]
+                    else:
+                        _contractAddress.__dict__.pop(name, None)
+
+    '''
+        Return a new locator which shares the given components with this locator, and copies all other components lazily
+        The components of this locator must not change while the new locator is in use (fork it again in order to keep changing it)
+    '''
+    def fork(self, _sharedIdentifiers = ('ModelCalculator', 'PriceBandCalculator', 'ModelDataSource')):
+        contractAddressLocator = ContractAddressLocator()
+        contractAddressLocator.bound = self.bound
+        for identifier, contractAddress in list(self.registry.items()) + list(self.registry.origins.items()):
+            if identifier in _sharedIdentifiers:
+                contractAddressLocator.registry[identifier] = contractAddress
+            else:
+                contractAddressLocator.registry.origins[identifier] = contractAddress
+        return contractAddressLocator
+
+    '''
+        Copy the state of the given component, excluding its locator, its resolved dependencies and its derived attributes
+    '''
+    def clone(self, _contractAddress):
+        contractAddress = copy(_contractAddress)
+        dependencies = type(_contractAddress).dependencies if isinstance(_contractAddress, ContractAddressLocatorHolder) else {}
+        derived = getattr(type(_contractAddress), 'derived', {})
+        for name, value in list(vars(contractAddress).items()):
+            if name in dependencies:
+                del contractAddress.__dict__[name]
+            elif name in derived:
+                contractAddress.__dict__[name] = derived[name]
+            elif name == 'contractAddressLocator':
+                contractAddress.__dict__[name] = self
+            else:
+                contractAddress.__dict__[name] = deepcopy(value)
+        return contractAddress
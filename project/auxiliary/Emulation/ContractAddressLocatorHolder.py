@@ -0,0 +1,15 @@
+class ContractAddressLocatorHolder:
+    '''
+        Map the name of every attribute which refers to another component to the identifier of that component
+        The attribute is resolved via the contract address locator on every access, unless the locator is bound
+    '''
+    dependencies = {}
+
+    def __getattr__(self, _name):
+        if _name not in type(self).dependencies:
+            raise AttributeError(_name)
+        contractAddressLocator = self.__dict__['contractAddressLocator']
+        contractAddress = contractAddressLocator.get(type(self).dependencies[_name])
+        if contractAddressLocator.bound:
+            self.__dict__[_name] = contractAddress
+        return contractAddress
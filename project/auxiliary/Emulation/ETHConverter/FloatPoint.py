@@ -1,8 +1,11 @@
 from decimal import Decimal
+from ContractAddressLocatorHolder import ContractAddressLocatorHolder
 
 MAX_RESOLUTION = 0x10000000000000000;
 
-class ETHConverter():
+class ETHConverter(ContractAddressLocatorHolder):
+    dependencies = {'transactionLimiter': 'TransactionLimiter'};
+
     def __init__(self, _contractAddressLocator):
         self.contractAddressLocator = _contractAddressLocator;
         self.sequenceNum = 0;
@@ -24,7 +27,7 @@ class ETHConverter():
             self.highPriceD = _highPriceD;
             self.lowPriceN = _lowPriceN;
             self.lowPriceD = _lowPriceD;
-            self.contractAddressLocator.get('TransactionLimiter').resetTotal();
+            self.transactionLimiter.resetTotal();
 
     def toSdrAmount(self, _ethAmount):
         return Decimal(_ethAmount) * self.lowPriceN / self.lowPriceD;
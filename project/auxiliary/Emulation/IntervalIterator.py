@@ -1,4 +1,8 @@
-class IntervalIterator():
+from ContractAddressLocatorHolder import ContractAddressLocatorHolder
+
+class IntervalIterator(ContractAddressLocatorHolder):
+    dependencies = {'mintingPointTimersManager': 'MintingPointTimersManager', 'modelDataSource': 'ModelDataSource'};
+
     def __init__(self, _contractAddressLocator):
         self.contractAddressLocator = _contractAddressLocator;
         self.row = 0;
@@ -7,12 +11,12 @@ class IntervalIterator():
     def grow(self):
         if (self.col == 0):
             self.row += 1;
-            self.contractAddressLocator.get('MintingPointTimersManager').start(self.row);
+            self.mintingPointTimersManager.start(self.row);
         else:
             self.col -= 1;
 
     def shrink(self):
-        mintingPointTimersManager = self.contractAddressLocator.get('MintingPointTimersManager');
+        mintingPointTimersManager = self.mintingPointTimersManager;
         if (mintingPointTimersManager.running(self.row)):
             mintingPointTimersManager.reset(self.row);
             assert(self.row > 0);
@@ -20,8 +24,96 @@ class IntervalIterator():
         else:
             self.col += 1;
 
+    '''
+        Equivalent to calling 'grow' while the given SDR amount covers the current interval, without changing any state
+        The SDR amount is what remains after leaving the current interval
+        Return the destination indexes, and the SDR and SGR amounts covered by the intervals in between
+    '''
+    def getGrowDestination(self, _sdrAmount):
+        return self.modelDataSource.getGrowDestination(self.row, self.col, _sdrAmount);
+
+    '''
+        Equivalent to calling 'shrink' while the given SGR amount exceeds the current interval, without changing any state
+        The SGR amount is what remains after leaving the current interval
+        Return the destination indexes, and the SDR and SGR amounts covered by the intervals in between
+    '''
+    def getShrinkDestination(self, _sgrAmount):
+        mintingPointTimersManager = self.mintingPointTimersManager;
+        return self.modelDataSource.getShrinkDestination(self.row, self.col, self.getHighestIdleRow(mintingPointTimersManager), _sgrAmount);
+
+    '''
+        Same as 'getGrowDestination', but for a given SGR amount
+    '''
+    def getGrowDestinationBySgr(self, _sgrAmount):
+        return self.modelDataSource.getGrowDestinationBySgr(self.row, self.col, _sgrAmount);
+
+    '''
+        Same as 'getShrinkDestination', but for a given SDR amount
+    '''
+    def getShrinkDestinationBySdr(self, _sdrAmount):
+        mintingPointTimersManager = self.mintingPointTimersManager;
+        return self.modelDataSource.getShrinkDestinationBySdr(self.row, self.col, self.getHighestIdleRow(mintingPointTimersManager), _sdrAmount);
+
+    '''
+        Move to a destination returned by 'getGrowDestination' or by 'getShrinkDestination'
+        Start the timers of the rows entered, or reset the timers of the rows left
+    '''
+    def moveTo(self, _rowNum, _colNum):
+        mintingPointTimersManager = self.mintingPointTimersManager;
+        if (_rowNum > self.row):
+            mintingPointTimersManager.startRange(self.row + 1, _rowNum + 1);
+        if (_rowNum < self.row):
+            mintingPointTimersManager.resetRange(_rowNum + 1, self.row + 1);
+        self.row = _rowNum;
+        self.col = _colNum;
+
+    '''
+        Move to the interval in the given row which contains the given SDR total, without replaying the trades which have led to it
+        The same total can be contained in intervals of different rows, so the row is given rather than derived from the total
+        Start the timers of the rows up to the given row at the given values (see 'restore')
+    '''
+    def seek(self, _sdrTotal, _rowNum, _timerValues):
+        self.restore(_rowNum, self.modelDataSource.getColNumBySdr(_rowNum, _sdrTotal), _timerValues);
+
+    '''
+        Same as 'seek', but for a given SGR total
+    '''
+    def seekBySgr(self, _sgrTotal, _rowNum, _timerValues):
+        self.restore(_rowNum, self.modelDataSource.getColNumBySgr(_rowNum, _sgrTotal), _timerValues);
+
+    '''
+        Set the current interval, and start the timer of every row from 1 up to the given row at its given value
+        The timers of these rows are always started, since each one of them has been entered by growing and has not been left by shrinking
+        Whether each timer is still running or has already expired depends on its value, hence the values cannot be derived from the interval
+    '''
+    def restore(self, _rowNum, _colNum, _timerValues):
+        mintingPointTimersManager = self.mintingPointTimersManager;
+        assert(len(_timerValues) == _rowNum);
+        mintingPointTimersManager.resetRange(1, self.row + 1);
+        mintingPointTimersManager.startRangeAt(1, _timerValues);
+        self.row = _rowNum;
+        self.col = _colNum;
+
+    '''
+        Return the highest row (up to the current row) whose timer is not running
+        The rows which are running always form a contiguous range ending at the current row
+    '''
+    def getHighestIdleRow(self, _mintingPointTimersManager):
+        lo = 0;
+        hi = self.row;
+        while (lo < hi):
+            mid = (lo + hi + 1) // 2;
+            if (_mintingPointTimersManager.running(mid)):
+                hi = mid - 1;
+            else:
+                lo = mid;
+        return lo;
+
     def getCurrentInterval(self):
-        return self.contractAddressLocator.get('ModelDataSource').getInterval(self.row, self.col);
+        return self.modelDataSource.getInterval(self.row, self.col);
 
     def getCurrentIntervalCoefs(self):
-        return self.contractAddressLocator.get('ModelDataSource').getIntervalCoefs(self.row, self.col);
+        return self.modelDataSource.getIntervalCoefs(self.row, self.col);
+
+    def getCurrentIntervalIndexes(self):
+        return (self.row, self.col);
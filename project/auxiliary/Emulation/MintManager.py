@@ -1,15 +1,19 @@
-class MintManager():
+from ContractAddressLocatorHolder import ContractAddressLocatorHolder
+
+class MintManager(ContractAddressLocatorHolder):
+    dependencies = {'mintingPointTimersManager': 'MintingPointTimersManager', 'modelDataSource': 'ModelDataSource', 'mintListener': 'MintListener'};
+
     def __init__(self, _contractAddressLocator):
         self.contractAddressLocator = _contractAddressLocator;
         self.index = 0;
 
     def isMintingStateOutdated(self):
-        return self.contractAddressLocator.get('MintingPointTimersManager').expired(self.index + 1);
+        return self.mintingPointTimersManager.expired(self.index + 1);
 
     def updateMintingState(self):
         if (self.isMintingStateOutdated()):
-            amount = self.contractAddressLocator.get('ModelDataSource').getRequiredMintAmount(self.index);
-            self.contractAddressLocator.get('MintListener').mintSgrForSgnHolders(amount);
+            amount = self.modelDataSource.getRequiredMintAmount(self.index);
+            self.mintListener.mintSgrForSgnHolders(amount);
             self.index += 1;
 
     def getIndex(self):
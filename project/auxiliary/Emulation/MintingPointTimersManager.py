@@ -1,4 +1,12 @@
+from heapq import heappush, heappop, heapify
+
 class MintingPointTimersManager():
+    '''
+        Map the name of every attribute which is rebuilt from the others when needed to its value until then
+        Such an attribute is reset instead of being copied when the component is cloned or restored
+    '''
+    derived = {'deadlines': None};
+
     class Timestamp():
         def __init__(self, _valid, _value):
             self.valid = _valid;
@@ -9,12 +17,24 @@ class MintingPointTimersManager():
         self.now = 1;
         self.timeout = _timeout;
         self.timestamps = [MintingPointTimersManager.Timestamp(False, 0) for r in range(95)];
+        self.deadlines = MintingPointTimersManager.derived['deadlines'];
 
     def start(self, _id):
+        self.startAt(_id, self.time());
+
+    '''
+        Start the timer at the given time, and schedule its deadline if the deadlines are being tracked (see 'popExpired')
+    '''
+    def startAt(self, _id, _value):
         timestamp = self.timestamps[_id];
         assert(not timestamp.valid);
         timestamp.valid = True;
-        timestamp.value = self.time();
+        timestamp.value = _value;
+        if (self.deadlines is not None):
+            if (len(self.deadlines) >= 2 * len(self.timestamps)):
+                self.deadlines = [entry for entry in self.deadlines if self.scheduled(*entry)];
+                heapify(self.deadlines);
+            heappush(self.deadlines, (_value + self.timeout, _id));
 
     def reset(self, _id):
         timestamp = self.timestamps[_id];
@@ -22,6 +42,21 @@ class MintingPointTimersManager():
         timestamp.valid = False;
         timestamp.value = 0;
 
+    def startRange(self, _fromId, _toId):
+        for _id in range(_fromId, _toId):
+            self.start(_id);
+
+    def resetRange(self, _fromId, _toId):
+        for _id in range(_fromId, _toId):
+            self.reset(_id);
+
+    '''
+        Start the timers from the given one on, each one at its given value
+    '''
+    def startRangeAt(self, _fromId, _values):
+        for (_id, _value) in enumerate(_values, _fromId):
+            self.startAt(_id, _value);
+
     def running(self, _id):
         timestamp = self.timestamps[_id];
         if (not timestamp.valid):
@@ -34,5 +69,25 @@ class MintingPointTimersManager():
             return False;
         return timestamp.value + self.timeout < self.time();
 
+    '''
+        Return the timers which have expired since the last call, in the order of their deadlines
+        The deadlines are tracked from the first call on, and after the component has been cloned or restored (such a call returns every expired timer)
+        Deadlines of timers which have been reset (and possibly restarted) since they were scheduled are discarded
+    '''
+    def popExpired(self):
+        if (self.deadlines is None):
+            self.deadlines = [(timestamp.value + self.timeout, _id) for (_id, timestamp) in enumerate(self.timestamps) if timestamp.valid];
+            heapify(self.deadlines);
+        expiredIds = [];
+        while (len(self.deadlines) > 0 and self.deadlines[0][0] < self.time()):
+            (deadline, _id) = heappop(self.deadlines);
+            if (self.scheduled(deadline, _id)):
+                expiredIds.append(_id);
+        return expiredIds;
+
+    def scheduled(self, _deadline, _id):
+        timestamp = self.timestamps[_id];
+        return timestamp.valid and timestamp.value + self.timeout == _deadline;
+
     def time(self):
         return self.now;
@@ -53,12 +53,34 @@ def getNewR(_newN, _minN, _minR, _alpha, _beta):
     temp2 = _alpha - _beta * _newN;
     return pow(temp1 * FIXED_ONE // temp2 * _newN, _minN, A_B_SCALE, _alpha) * _minR // FIXED_ONE;
 
+'''
+    Equivalent to [getNewN(x, minR, minN, alpha, beta) for x in newRList]
+    The terms which depend only on the interval are computed once for the entire list
+'''
+def getNewNBatch(_newRList, _minR, _minN, _alpha, _beta):
+    temp1 = _alpha * FIXED_ONE // _minN - _beta * FIXED_ONE;
+    return [_alpha * temp2 // (temp1 + _beta * temp2) for temp2 in powBatch([_newR * FIXED_ONE for _newR in _newRList], _minR, _alpha, A_B_SCALE)];
+
+'''
+    Equivalent to [getNewR(x, minN, minR, alpha, beta) for x in newNList]
+    The terms which depend only on the interval are computed once for the entire list
+'''
+def getNewRBatch(_newNList, _minN, _minR, _alpha, _beta):
+    temp1 = (_alpha - _beta * _minN) * FIXED_ONE;
+    return [temp2 * _minR // FIXED_ONE for temp2 in powBatch([temp1 // (_alpha - _beta * _newN) * _newN for _newN in _newNList], _minN, A_B_SCALE, _alpha)];
+
 '''
     Return (a / b / FIXED_ONE) ^ (c / d) * FIXED_ONE
 '''
 def pow(_a, _b, _c, _d):
     return exp(log(_a // _b) * _c // _d);
 
+'''
+    Equivalent to [pow(a, b, c, d) for a in aList]
+'''
+def powBatch(_aList, _b, _c, _d):
+    return [exp(log(_a // _b) * _c // _d) for _a in _aList];
+
 '''
     Return log(x / FIXED_ONE) * FIXED_ONE
     Auto-generated via 'PrintFunctionLog.py'
@@ -143,3 +165,33 @@ def exp(_x):
     assert(_x < 0x100000000000000000000000000000000); # ensure that the input is smaller than 2^(+3)
 
     return res;
+
+'''
+    Hold the terms which depend only on the interval, so that they are computed once per interval
+    Functions 'newN', 'newR', 'valN' and 'valR' are equivalent to 'getNewN', 'getNewR', 'getValN' and 'getValR'
+'''
+class PreparedInterval():
+    def __init__(self, _minN, _maxN, _minR, _maxR, _alpha, _beta):
+        self.minN = _minN;
+        self.maxN = _maxN;
+        self.minR = _minR;
+        self.maxR = _maxR;
+        self.alpha = _alpha;
+        self.beta = _beta;
+        self.trivial = isTrivialInterval(_alpha, _beta);
+        if (not self.trivial):
+            self.baseN = _alpha * FIXED_ONE // _minN - _beta * FIXED_ONE;
+            self.baseR = (_alpha - _beta * _minN) * FIXED_ONE;
+
+    def valN(self, _valR):
+        return _valR * self.maxN // self.maxR;
+
+    def valR(self, _valN):
+        return _valN * self.maxR // self.maxN;
+
+    def newN(self, _newR):
+        temp = exp(log(_newR * FIXED_ONE // self.minR) * self.alpha // A_B_SCALE);
+        return self.alpha * temp // (self.baseN + self.beta * temp);
+
+    def newR(self, _newN):
+        return exp(log(self.baseR // (self.alpha - self.beta * _newN) * _newN // self.minN) * A_B_SCALE // self.alpha) * self.minR // FIXED_ONE;
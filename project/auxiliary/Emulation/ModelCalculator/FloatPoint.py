@@ -55,3 +55,51 @@ def getNewR(_newN, _minN, _minR, _alpha, _beta):
     temp1 = _alpha - _beta * _minN;
     temp2 = _alpha - _beta * _newN;
     return (temp1 / temp2 * _newN / _minN) ** (A_B_SCALE / _alpha) * _minR;
+
+'''
+    Equivalent to [getNewN(x, minR, minN, alpha, beta) for x in newRList]
+    The terms which depend only on the interval are computed once for the entire list
+'''
+def getNewNBatch(_newRList, _minR, _minN, _alpha, _beta):
+    _minR, _minN, _alpha, _beta = [Decimal(val) for val in (_minR, _minN, _alpha, _beta)]
+    temp1 = _alpha / A_B_SCALE;
+    temp2 = _alpha / _minN;
+    return [_alpha * temp / (temp2 + _beta * (temp - 1)) for temp in [(Decimal(_newR) / _minR) ** temp1 for _newR in _newRList]];
+
+'''
+    Equivalent to [getNewR(x, minN, minR, alpha, beta) for x in newNList]
+    The terms which depend only on the interval are computed once for the entire list
+'''
+def getNewRBatch(_newNList, _minN, _minR, _alpha, _beta):
+    _minN, _minR, _alpha, _beta = [Decimal(val) for val in (_minN, _minR, _alpha, _beta)]
+    temp1 = _alpha - _beta * _minN;
+    temp2 = A_B_SCALE / _alpha;
+    return [(temp1 / (_alpha - _beta * _newN) * _newN / _minN) ** temp2 * _minR for _newN in [Decimal(val) for val in _newNList]];
+
+'''
+    Hold the terms which depend only on the interval, so that they are computed once per interval
+    Functions 'newN', 'newR', 'valN' and 'valR' are equivalent to 'getNewN', 'getNewR', 'getValN' and 'getValR'
+'''
+class PreparedInterval():
+    def __init__(self, _minN, _maxN, _minR, _maxR, _alpha, _beta):
+        self.trivial = isTrivialInterval(_alpha, _beta);
+        self.minN, self.maxN, self.minR, self.maxR, self.alpha, self.beta = [Decimal(val) for val in (_minN, _maxN, _minR, _maxR, _alpha, _beta)]
+        if (not self.trivial):
+            self.baseN = self.alpha / self.minN;
+            self.baseR = self.alpha - self.beta * self.minN;
+            self.expoN = self.alpha / A_B_SCALE;
+            self.expoR = A_B_SCALE / self.alpha;
+
+    def valN(self, _valR):
+        return Decimal(_valR) * self.maxN / self.maxR;
+
+    def valR(self, _valN):
+        return Decimal(_valN) * self.maxR / self.maxN;
+
+    def newN(self, _newR):
+        temp = (Decimal(_newR) / self.minR) ** self.expoN;
+        return self.alpha * temp / (self.baseN + self.beta * (temp - 1));
+
+    def newR(self, _newN):
+        _newN = Decimal(_newN);
+        return (self.baseR / (self.alpha - self.beta * _newN) * _newN / self.minN) ** self.expoR * self.minR;
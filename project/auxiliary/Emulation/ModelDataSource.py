@@ -1,34 +1,188 @@
-class ModelDataSource():
-    class Interval():
-        def __init__(self, _minN, _maxN, _minR, _maxR, _alpha, _beta):
-            self.minN = _minN;
-            self.maxN = _maxN;
-            self.minR = _minR;
-            self.maxR = _maxR;
-            self.alpha = _alpha;
-            self.beta = _beta;
-
-    def __init__(self):
+from bisect import bisect_left, bisect_right
+from itertools import takewhile
+from ContractAddressLocatorHolder import ContractAddressLocatorHolder
+
+'''
+    Return the partial sums of the given widths, starting with 0
+'''
+def accumulate(_widths):
+    sums = [0];
+    for width in _widths:
+        sums.append(sums[-1] + width);
+    return sums;
+
+EMPTY_INTERVAL = (0, 0, 0, 0, 0, 0);
+
+class ModelDataSource(ContractAddressLocatorHolder):
+    dependencies = {'modelCalculator': 'ModelCalculator'};
+
+    def __init__(self, _contractAddressLocator):
+        self.contractAddressLocator = _contractAddressLocator;
         self.intervalListsLocked = False;
-        self.intervalLists = [[ModelDataSource.Interval(0, 0, 0, 0, 0, 0) for c in range(11)] for r in range(95)];
+        self.rowCount = 0;
+        self.colCount = 0;
+        self.intervals = [];
+        self.intervalCoefs = [];
+        self.preparedIntervals = None;
+        self.rowWidthsR = None;
+        self.rowWidthsN = None;
+        self.colWidthsR = None;
+        self.colWidthsN = None;
+        self.rowMaxR = None;
+        self.rowMaxN = None;
 
     def lock(self):
         self.intervalListsLocked = True;
+        self.preparedIntervals = [self.prepareInterval(interval) for interval in self.intervals];
+        intervalLists = [self.intervals[rowNum * self.colCount:(rowNum + 1) * self.colCount] for rowNum in range(self.rowCount)];
+        validLists = list(takewhile(len, [list(takewhile(lambda interval: interval[1] > 0, intervalList)) for intervalList in intervalLists]));
+        self.rowWidthsR = [accumulate([maxR - minR for (minN, maxN, minR, maxR, alpha, beta) in validList]) for validList in validLists];
+        self.rowWidthsN = [accumulate([maxN - minN for (minN, maxN, minR, maxR, alpha, beta) in validList]) for validList in validLists];
+        self.colWidthsR = accumulate([validList[0][3] - validList[0][2] for validList in validLists]);
+        self.colWidthsN = accumulate([validList[0][1] - validList[0][0] for validList in validLists]);
+        self.rowMaxR = [validList[0][3] for validList in validLists];
+        self.rowMaxN = [validList[0][1] for validList in validLists];
+
+    def prepareInterval(self, _interval):
+        if (_interval[1] == 0):
+            return None;
+        modelCalculator = self.modelCalculator;
+        return modelCalculator.PreparedInterval(*_interval);
+
+    '''
+        Extend the table to the given dimensions, filling new entries with an empty interval
+        The intervals are stored in a flat row-major list, so adding columns moves the existing rows
+    '''
+    def resize(self, _rowCount, _colCount):
+        if (_colCount > self.colCount):
+            padding = [EMPTY_INTERVAL] * (_colCount - self.colCount);
+            self.intervals = sum([self.intervals[rowNum * self.colCount:(rowNum + 1) * self.colCount] + padding for rowNum in range(self.rowCount)], []);
+            self.colCount = _colCount;
+        if (_rowCount > self.rowCount):
+            self.intervals += [EMPTY_INTERVAL] * ((_rowCount - self.rowCount) * self.colCount);
+            self.rowCount = _rowCount;
+        self.intervalCoefs = [interval[4:] for interval in self.intervals];
 
     def setInterval(self, _rowNum, _colNum, _minN, _maxN, _minR, _maxR, _alpha, _beta):
         assert(not self.intervalListsLocked);
-        self.intervalLists[_rowNum][_colNum] = ModelDataSource.Interval(_minN, _maxN, _minR, _maxR, _alpha, _beta);
+        if (_rowNum >= self.rowCount or _colNum >= self.colCount):
+            self.resize(max(self.rowCount, _rowNum + 1), max(self.colCount, _colNum + 1));
+        index = _rowNum * self.colCount + _colNum;
+        self.intervals[index] = (_minN, _maxN, _minR, _maxR, _alpha, _beta);
+        self.intervalCoefs[index] = (_alpha, _beta);
 
+    '''
+        Return the stored interval tuple (minN, maxN, minR, maxR, alpha, beta)
+    '''
     def getInterval(self, _rowNum, _colNum):
-        interval = self.intervalLists[_rowNum][_colNum];
-        return (interval.minN, interval.maxN, interval.minR, interval.maxR, interval.alpha, interval.beta);
+        assert(_colNum < self.colCount);
+        return self.intervals[_rowNum * self.colCount + _colNum];
 
     def getIntervalCoefs(self, _rowNum, _colNum):
-        interval = self.intervalLists[_rowNum][_colNum];
-        return (interval.alpha, interval.beta);
+        assert(_colNum < self.colCount);
+        return self.intervalCoefs[_rowNum * self.colCount + _colNum];
+
+    def getPreparedInterval(self, _rowNum, _colNum):
+        assert(self.intervalListsLocked);
+        assert(_colNum < self.colCount);
+        return self.preparedIntervals[_rowNum * self.colCount + _colNum];
+
+    '''
+        Equivalent to repeatedly calling 'IntervalIterator.grow' while the given SDR amount covers the current interval
+        The SDR amount is what remains after leaving the interval at the given row and column
+        Return the destination row and column, and the SDR and SGR amounts covered by the intervals in between
+    '''
+    def getGrowDestination(self, _rowNum, _colNum, _sdrAmount):
+        return self.findGrowDestination(self.rowWidthsR, self.colWidthsR, self.rowWidthsN, self.colWidthsN, _rowNum, _colNum, _sdrAmount);
+
+    '''
+        Same as 'getGrowDestination', but for a given SGR amount (which remains after leaving the interval)
+    '''
+    def getGrowDestinationBySgr(self, _rowNum, _colNum, _sgrAmount):
+        (rowNum, colNum, sgrDelta, sdrDelta) = self.findGrowDestination(self.rowWidthsN, self.colWidthsN, self.rowWidthsR, self.colWidthsR, _rowNum, _colNum, _sgrAmount);
+        return (rowNum, colNum, sdrDelta, sgrDelta);
+
+    '''
+        Equivalent to repeatedly calling 'IntervalIterator.shrink' while the given SGR amount exceeds the current interval
+        The SGR amount is what remains after leaving the interval at the given row and column
+        The rows above the given minimum row are left through their first column (their timers are running)
+        Return the destination row and column, and the SDR and SGR amounts covered by the intervals in between
+    '''
+    def getShrinkDestination(self, _rowNum, _colNum, _minRowNum, _sgrAmount):
+        (rowNum, colNum, sgrDelta, sdrDelta) = self.findShrinkDestination(self.rowWidthsN, self.colWidthsN, self.rowWidthsR, self.colWidthsR, _rowNum, _colNum, _minRowNum, _sgrAmount);
+        return (rowNum, colNum, sdrDelta, sgrDelta);
+
+    '''
+        Same as 'getShrinkDestination', but for a given SDR amount (which remains after leaving the interval)
+    '''
+    def getShrinkDestinationBySdr(self, _rowNum, _colNum, _minRowNum, _sdrAmount):
+        return self.findShrinkDestination(self.rowWidthsR, self.colWidthsR, self.rowWidthsN, self.colWidthsN, _rowNum, _colNum, _minRowNum, _sdrAmount);
+
+    '''
+        Find the interval where an amount of the first kind runs out along the growing path
+        Return the destination row and column, and the amounts of both kinds covered by the intervals in between
+    '''
+    def findGrowDestination(self, _rowWidths1, _colWidths1, _rowWidths2, _colWidths2, _rowNum, _colNum, _amount):
+        assert(self.intervalListsLocked);
+        rowWidths1 = _rowWidths1[_rowNum];
+        rowWidths2 = _rowWidths2[_rowNum];
+        if (_amount < rowWidths1[_colNum]):
+            colNum = bisect_left(rowWidths1, rowWidths1[_colNum] - _amount) - 1;
+            return (_rowNum, colNum, rowWidths1[_colNum] - rowWidths1[colNum + 1], rowWidths2[_colNum] - rowWidths2[colNum + 1]);
+        rowNum = bisect_right(_colWidths1, _amount - rowWidths1[_colNum] + _colWidths1[_rowNum + 1]) - 1;
+        assert(rowNum < len(_colWidths1) - 1);
+        delta1 = rowWidths1[_colNum] + _colWidths1[rowNum] - _colWidths1[_rowNum + 1];
+        delta2 = rowWidths2[_colNum] + _colWidths2[rowNum] - _colWidths2[_rowNum + 1];
+        return (rowNum, 0, delta1, delta2);
+
+    '''
+        Find the interval where an amount of the first kind runs out along the shrinking path
+        Return the destination row and column, and the amounts of both kinds covered by the intervals in between
+    '''
+    def findShrinkDestination(self, _rowWidths1, _colWidths1, _rowWidths2, _colWidths2, _rowNum, _colNum, _minRowNum, _amount):
+        assert(self.intervalListsLocked);
+        delta1 = 0;
+        delta2 = 0;
+        if (_minRowNum < _rowNum):
+            assert(_colNum == 0);
+            rowNum = bisect_right(_colWidths1, _colWidths1[_rowNum] - _amount) - 1;
+            if (rowNum >= _minRowNum):
+                return (rowNum, 0, _colWidths1[_rowNum] - _colWidths1[rowNum + 1], _colWidths2[_rowNum] - _colWidths2[rowNum + 1]);
+            delta1 = _colWidths1[_rowNum] - _colWidths1[_minRowNum];
+            delta2 = _colWidths2[_rowNum] - _colWidths2[_minRowNum];
+            _amount -= delta1;
+        rowWidths1 = _rowWidths1[_minRowNum];
+        rowWidths2 = _rowWidths2[_minRowNum];
+        colNum = bisect_left(rowWidths1, _amount + rowWidths1[_colNum + 1]) - 1;
+        assert(colNum < len(rowWidths1) - 1);
+        delta1 += rowWidths1[colNum] - rowWidths1[_colNum + 1];
+        delta2 += rowWidths2[colNum] - rowWidths2[_colNum + 1];
+        return (_minRowNum, colNum, delta1, delta2);
+
+    '''
+        Return the column of the interval in the given row which contains the given SDR total
+    '''
+    def getColNumBySdr(self, _rowNum, _sdrTotal):
+        return self.findColNum(self.rowWidthsR[_rowNum], self.rowMaxR[_rowNum], _sdrTotal);
+
+    '''
+        Same as 'getColNumBySdr', but for a given SGR total
+    '''
+    def getColNumBySgr(self, _rowNum, _sgrTotal):
+        return self.findColNum(self.rowWidthsN[_rowNum], self.rowMaxN[_rowNum], _sgrTotal);
+
+    '''
+        The intervals in a row are adjacent, and their widths are accumulated from the upper end of the first interval
+        An interval contains the totals from its lower end (inclusive) up to its upper end (exclusive)
+    '''
+    def findColNum(self, _rowWidths, _rowMax, _total):
+        assert(self.intervalListsLocked);
+        colNum = bisect_left(_rowWidths, _rowMax - _total) - 1;
+        assert(0 <= colNum < len(_rowWidths) - 1);
+        return colNum;
 
     def getRequiredMintAmount(self, _rowNum):
-        currMaxN = self.intervalLists[_rowNum + 0][0].maxN;
-        nextMinN = self.intervalLists[_rowNum + 1][0].minN;
+        currMaxN = self.getInterval(_rowNum + 0, 0)[1];
+        nextMinN = self.getInterval(_rowNum + 1, 0)[0];
         assert(nextMinN >= currMaxN);
         return nextMinN - currMaxN;
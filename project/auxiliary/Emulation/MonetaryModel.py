@@ -1,29 +1,202 @@
-class MonetaryModel():
+from ContractAddressLocatorHolder import ContractAddressLocatorHolder
+
+class MonetaryModel(ContractAddressLocatorHolder):
+    dependencies = {'monetaryModelState': 'MonetaryModelState', 'intervalIterator': 'IntervalIterator', 'modelDataSource': 'ModelDataSource', 'priceBandCalculator': 'PriceBandCalculator'};
+
     def __init__(self, _contractAddressLocator):
         self.contractAddressLocator = _contractAddressLocator;
 
     def buy(self, _sdrAmount):
-        monetaryModelState = self.contractAddressLocator.get('MonetaryModelState');
-        intervalIterator = self.contractAddressLocator.get('IntervalIterator');
+        (sgrAmount, sdrTotal, sgrTotal, rowNum, colNum) = self.calcBuy(_sdrAmount);
+        self.setState(sdrTotal, sgrTotal, rowNum, colNum);
+        return sgrAmount;
+
+    def sell(self, _sgrAmount):
+        (sdrAmount, sdrTotal, sgrTotal, rowNum, colNum) = self.calcSell(_sgrAmount);
+        self.setState(sdrTotal, sgrTotal, rowNum, colNum);
+        return sdrAmount;
+
+    '''
+        Return the output of 'buy' without changing the state of the system
+    '''
+    def quoteBuy(self, _sdrAmount):
+        return self.calcBuy(_sdrAmount)[0];
+
+    '''
+        Return the output of 'sell' without changing the state of the system
+    '''
+    def quoteSell(self, _sgrAmount):
+        return self.calcSell(_sgrAmount)[0];
 
+    '''
+        Buy the given SGR amount (or slightly more) for the minimal SDR amount, and return that SDR amount
+    '''
+    def buyExactOut(self, _sgrAmount):
+        sdrAmount = self.quoteBuyExactOut(_sgrAmount);
+        self.buy(sdrAmount);
+        return sdrAmount;
+
+    '''
+        Sell the minimal SGR amount which yields the given SDR amount (or slightly more), and return that SGR amount
+    '''
+    def sellExactOut(self, _sdrAmount):
+        sgrAmount = self.quoteSellExactOut(_sdrAmount);
+        self.sell(sgrAmount);
+        return sgrAmount;
+
+    '''
+        Return the minimal SDR amount for which 'buy' returns at least the given SGR amount
+    '''
+    def quoteBuyExactOut(self, _sgrAmount):
+        return self.solveInput(self.quoteBuy, _sgrAmount, self.estimateBuyInput(_sgrAmount));
+
+    '''
+        Return the minimal SGR amount for which 'sell' returns at least the given SDR amount
+    '''
+    def quoteSellExactOut(self, _sdrAmount):
+        return self.solveInput(self.quoteSell, _sdrAmount, self.estimateSellInput(_sdrAmount));
+
+    '''
+        Return the minimal input for which the given quote function returns at least the given output
+        Starting from the given estimate, expand the search range in exponential steps until the minimal input is bracketed
+    '''
+    def solveInput(self, _quoteFunc, _output, _input):
+        if (_output <= 0):
+            return 0;
+        lo = hi = max(_input, 0);
+        step = 1;
+        if (_quoteFunc(hi) >= _output):
+            lo = hi - step;
+            while (lo > 0 and _quoteFunc(lo) >= _output):
+                hi = lo;
+                step *= 2;
+                lo = hi - step;
+            lo = max(lo, 0);
+        else:
+            while (_quoteFunc(hi) < _output):
+                lo = hi;
+                hi = lo + step;
+                step *= 2;
+        while (hi - lo > 1):
+            mid = (lo + hi) // 2;
+            if (_quoteFunc(mid) >= _output):
+                hi = mid;
+            else:
+                lo = mid;
+        return hi;
+
+    '''
+        Estimate the SDR amount required for buying the given SGR amount, by inverting the model along the growing path
+    '''
+    def estimateBuyInput(self, _sgrAmount):
+        monetaryModelState = self.monetaryModelState;
+        intervalIterator = self.intervalIterator;
+        modelDataSource = self.modelDataSource;
+
+        sdrCount = 0;
+        sgrCount = _sgrAmount;
+
+        sdrTotal = monetaryModelState.getSdrTotal();
         sgrTotal = monetaryModelState.getSgrTotal();
+
+        (rowNum, colNum) = intervalIterator.getCurrentIntervalIndexes();
+        (minN, maxN, minR, maxR, alpha, beta) = modelDataSource.getInterval(rowNum, colNum);
+        if (sgrCount >= maxN - sgrTotal):
+            sgrCount -= maxN - sgrTotal;
+            sdrCount += maxR - sdrTotal;
+            (rowNum, colNum, sdrDelta, sgrDelta) = intervalIterator.getGrowDestinationBySgr(sgrCount);
+            (minN, maxN, minR, maxR, alpha, beta) = modelDataSource.getInterval(rowNum, colNum);
+            sdrTotal = minR;
+            sgrTotal = minN;
+            sgrCount -= sgrDelta;
+            sdrCount += sdrDelta;
+
+        if (sgrCount > 0):
+            preparedInterval = modelDataSource.getPreparedInterval(rowNum, colNum);
+            if (preparedInterval.trivial):
+                sdrDelta = preparedInterval.valR(sgrCount);
+            else:
+                sdrDelta = preparedInterval.newR(sgrTotal + sgrCount) - sdrTotal;
+            sdrCount += sdrDelta;
+
         (alpha, beta) = intervalIterator.getCurrentIntervalCoefs();
-        sdrAmountAfterFee = self.contractAddressLocator.get('PriceBandCalculator').buy(_sdrAmount, sgrTotal, alpha, beta);
-        sgrAmount = self.buyFunc(sdrAmountAfterFee, monetaryModelState, intervalIterator);
+        return self.priceBandCalculator.buyInverse(sdrCount, monetaryModelState.getSgrTotal(), alpha, beta);
 
-        return sgrAmount;
+    '''
+        Estimate the SGR amount required for selling into the given SDR amount, by inverting the model along the shrinking path
+    '''
+    def estimateSellInput(self, _sdrAmount):
+        monetaryModelState = self.monetaryModelState;
+        intervalIterator = self.intervalIterator;
+        modelDataSource = self.modelDataSource;
 
-    def sell(self, _sgrAmount):
-        monetaryModelState = self.contractAddressLocator.get('MonetaryModelState');
-        intervalIterator = self.contractAddressLocator.get('IntervalIterator');
+        (alpha, beta) = intervalIterator.getCurrentIntervalCoefs();
+        sdrCount = self.priceBandCalculator.sellInverse(_sdrAmount, monetaryModelState.getSgrTotal(), alpha, beta);
+        sgrCount = 0;
+
+        sgrTotal = monetaryModelState.getSgrTotal();
+        sdrTotal = monetaryModelState.getSdrTotal();
+
+        (rowNum, colNum) = intervalIterator.getCurrentIntervalIndexes();
+        (minN, maxN, minR, maxR, alpha, beta) = modelDataSource.getInterval(rowNum, colNum);
+        if (sdrCount > sdrTotal - minR):
+            sdrCount -= sdrTotal - minR;
+            sgrCount += sgrTotal - minN;
+            (rowNum, colNum, sdrDelta, sgrDelta) = intervalIterator.getShrinkDestinationBySdr(sdrCount);
+            (minN, maxN, minR, maxR, alpha, beta) = modelDataSource.getInterval(rowNum, colNum);
+            sgrTotal = maxN;
+            sdrTotal = maxR;
+            sdrCount -= sdrDelta;
+            sgrCount += sgrDelta;
+
+        if (sdrCount > 0):
+            preparedInterval = modelDataSource.getPreparedInterval(rowNum, colNum);
+            if (preparedInterval.trivial):
+                sgrDelta = preparedInterval.valN(sdrCount);
+            else:
+                sgrDelta = sgrTotal - preparedInterval.newN(sdrTotal - sdrCount);
+            sgrCount += sgrDelta;
+
+        return sgrCount;
+
+    def calcBuy(self, _sdrAmount):
+        monetaryModelState = self.monetaryModelState;
+        intervalIterator = self.intervalIterator;
 
         sgrTotal = monetaryModelState.getSgrTotal();
         (alpha, beta) = intervalIterator.getCurrentIntervalCoefs();
-        sdrAmountBeforeFee = self.sellFunc(_sgrAmount, monetaryModelState, intervalIterator);
-        sdrAmount = self.contractAddressLocator.get('PriceBandCalculator').sell(sdrAmountBeforeFee, sgrTotal, alpha, beta);
+        sdrAmountAfterFee = self.priceBandCalculator.buy(_sdrAmount, sgrTotal, alpha, beta);
+        return self.buyFunc(sdrAmountAfterFee, monetaryModelState, intervalIterator);
 
-        return sdrAmount;
+    def calcSell(self, _sgrAmount):
+        monetaryModelState = self.monetaryModelState;
+        intervalIterator = self.intervalIterator;
+
+        sgrTotal = monetaryModelState.getSgrTotal();
+        (alpha, beta) = intervalIterator.getCurrentIntervalCoefs();
+        (sdrAmountBeforeFee, newSdrTotal, newSgrTotal, rowNum, colNum) = self.sellFunc(_sgrAmount, monetaryModelState, intervalIterator);
+        sdrAmount = self.priceBandCalculator.sell(sdrAmountBeforeFee, sgrTotal, alpha, beta);
+        return (sdrAmount, newSdrTotal, newSgrTotal, rowNum, colNum);
+
+    '''
+        Restore the model at the given totals, row and minting point timer values (see 'IntervalIterator.restore'), without replaying the trades which have led to them
+    '''
+    def restore(self, _sdrTotal, _sgrTotal, _rowNum, _timerValues):
+        monetaryModelState = self.monetaryModelState;
+        self.intervalIterator.seek(_sdrTotal, _rowNum, _timerValues);
+        monetaryModelState.setSdrTotal(_sdrTotal);
+        monetaryModelState.setSgrTotal(_sgrTotal);
+
+    def setState(self, _sdrTotal, _sgrTotal, _rowNum, _colNum):
+        monetaryModelState = self.monetaryModelState;
+        self.intervalIterator.moveTo(_rowNum, _colNum);
+        monetaryModelState.setSdrTotal(_sdrTotal);
+        monetaryModelState.setSgrTotal(_sgrTotal);
 
+    '''
+        Return the SGR amount along with the new SDR total, SGR total and interval indexes
+        Neither the model state nor the interval iterator are changed
+    '''
     def buyFunc(self, _sdrAmount, _monetaryModelState, _intervalIterator):
         sgrCount = 0;
         sdrCount = _sdrAmount;
@@ -31,31 +204,35 @@ class MonetaryModel():
         sdrTotal = _monetaryModelState.getSdrTotal();
         sgrTotal = _monetaryModelState.getSgrTotal();
 
-        (minN, maxN, minR, maxR, alpha, beta) = _intervalIterator.getCurrentInterval();
-        while (sdrCount >= maxR - sdrTotal):
-            sdrDelta = maxR - sdrTotal;
-            sgrDelta = maxN - sgrTotal;
-            _intervalIterator.grow();
-            (minN, maxN, minR, maxR, alpha, beta) = _intervalIterator.getCurrentInterval();
+        modelDataSource = self.modelDataSource;
+        (rowNum, colNum) = _intervalIterator.getCurrentIntervalIndexes();
+        (minN, maxN, minR, maxR, alpha, beta) = modelDataSource.getInterval(rowNum, colNum);
+        if (sdrCount >= maxR - sdrTotal):
+            sdrCount -= maxR - sdrTotal;
+            sgrCount += maxN - sgrTotal;
+            (rowNum, colNum, sdrDelta, sgrDelta) = _intervalIterator.getGrowDestination(sdrCount);
+            (minN, maxN, minR, maxR, alpha, beta) = modelDataSource.getInterval(rowNum, colNum);
             sdrTotal = minR;
             sgrTotal = minN;
             sdrCount -= sdrDelta;
             sgrCount += sgrDelta;
 
         if (sdrCount > 0):
-            if (self.contractAddressLocator.get('ModelCalculator').isTrivialInterval(alpha, beta)):
-                sgrDelta = self.contractAddressLocator.get('ModelCalculator').getValN(sdrCount, maxN, maxR);
+            preparedInterval = modelDataSource.getPreparedInterval(rowNum, colNum);
+            if (preparedInterval.trivial):
+                sgrDelta = preparedInterval.valN(sdrCount);
             else:
-                sgrDelta = self.contractAddressLocator.get('ModelCalculator').getNewN(sdrTotal + sdrCount, minR, minN, alpha, beta) - sgrTotal;
+                sgrDelta = preparedInterval.newN(sdrTotal + sdrCount) - sgrTotal;
             sdrTotal += sdrCount;
             sgrTotal += sgrDelta;
             sgrCount += sgrDelta;
 
-        _monetaryModelState.setSdrTotal(sdrTotal);
-        _monetaryModelState.setSgrTotal(sgrTotal);
-
-        return sgrCount;
+        return (sgrCount, sdrTotal, sgrTotal, rowNum, colNum);
 
+    '''
+        Return the SDR amount along with the new SDR total, SGR total and interval indexes
+        Neither the model state nor the interval iterator are changed
+    '''
     def sellFunc(self, _sgrAmount, _monetaryModelState, _intervalIterator):
         sdrCount = 0;
         sgrCount = _sgrAmount;
@@ -63,27 +240,27 @@ class MonetaryModel():
         sgrTotal = _monetaryModelState.getSgrTotal();
         sdrTotal = _monetaryModelState.getSdrTotal();
 
-        (minN, maxN, minR, maxR, alpha, beta) = _intervalIterator.getCurrentInterval();
-        while (sgrCount > sgrTotal - minN):
-            sgrDelta = sgrTotal - minN;
-            sdrDelta = sdrTotal - minR;
-            _intervalIterator.shrink();
-            (minN, maxN, minR, maxR, alpha, beta) = _intervalIterator.getCurrentInterval();
+        modelDataSource = self.modelDataSource;
+        (rowNum, colNum) = _intervalIterator.getCurrentIntervalIndexes();
+        (minN, maxN, minR, maxR, alpha, beta) = modelDataSource.getInterval(rowNum, colNum);
+        if (sgrCount > sgrTotal - minN):
+            sgrCount -= sgrTotal - minN;
+            sdrCount += sdrTotal - minR;
+            (rowNum, colNum, sdrDelta, sgrDelta) = _intervalIterator.getShrinkDestination(sgrCount);
+            (minN, maxN, minR, maxR, alpha, beta) = modelDataSource.getInterval(rowNum, colNum);
             sgrTotal = maxN;
             sdrTotal = maxR;
             sgrCount -= sgrDelta;
             sdrCount += sdrDelta;
 
         if (sgrCount > 0):
-            if (self.contractAddressLocator.get('ModelCalculator').isTrivialInterval(alpha, beta)):
-                sdrDelta = self.contractAddressLocator.get('ModelCalculator').getValR(sgrCount, maxR, maxN);
+            preparedInterval = modelDataSource.getPreparedInterval(rowNum, colNum);
+            if (preparedInterval.trivial):
+                sdrDelta = preparedInterval.valR(sgrCount);
             else:
-                sdrDelta = sdrTotal - self.contractAddressLocator.get('ModelCalculator').getNewR(sgrTotal - sgrCount, minN, minR, alpha, beta);
+                sdrDelta = sdrTotal - preparedInterval.newR(sgrTotal - sgrCount);
             sgrTotal -= sgrCount;
             sdrTotal -= sdrDelta;
             sdrCount += sdrDelta;
 
-        _monetaryModelState.setSgrTotal(sgrTotal);
-        _monetaryModelState.setSdrTotal(sdrTotal);
-
-        return sdrCount;
+        return (sdrCount, sdrTotal, sgrTotal, rowNum, colNum);
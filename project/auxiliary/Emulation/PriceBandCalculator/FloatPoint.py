@@ -34,3 +34,21 @@ def sell(_sdrAmount, _sgrTotal, _alpha, _beta):
     reserveRatio = _alpha - _beta * _sgrTotal;
     variableFix = _sdrAmount * (reserveRatio * (ONE + DELTA) - GAMMA) / (reserveRatio * ONE);
     return variableFix;
+
+'''
+    Return r such that buy(r, sgrTotal, alpha, beta) is equal to the given amount
+'''
+def buyInverse(_sdrAmountAfterFee, _sgrTotal, _alpha, _beta):
+    _sdrAmountAfterFee, _sgrTotal, _alpha, _beta = [Decimal(val) for val in (_sdrAmountAfterFee, _sgrTotal, _alpha, _beta)]
+    reserveRatio = _alpha - _beta * _sgrTotal;
+    variableFix = _sdrAmountAfterFee * (reserveRatio * (ONE - DELTA) + GAMMA) / (reserveRatio * ONE);
+    return variableFix;
+
+'''
+    Return r such that sell(r, sgrTotal, alpha, beta) is equal to the given amount
+'''
+def sellInverse(_sdrAmountAfterFee, _sgrTotal, _alpha, _beta):
+    _sdrAmountAfterFee, _sgrTotal, _alpha, _beta = [Decimal(val) for val in (_sdrAmountAfterFee, _sgrTotal, _alpha, _beta)]
+    reserveRatio = _alpha - _beta * _sgrTotal;
+    variableFix = _sdrAmountAfterFee * (reserveRatio * ONE) / (reserveRatio * (ONE + DELTA) - GAMMA);
+    return variableFix;
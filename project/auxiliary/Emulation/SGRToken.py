@@ -1,14 +1,18 @@
+from ContractAddressLocatorHolder import ContractAddressLocatorHolder
+
 MIN = 0
 MAX = 2 ** 256 - 1
 
-class SGRToken():
+class SGRToken(ContractAddressLocatorHolder):
+    dependencies = {'transactionManager': 'TransactionManager'}
+
     def __init__(self, _contractAddressLocator):
         self.contractAddressLocator = _contractAddressLocator
         self.ethTotal = 0
         self.sgrTotal = 0
 
     def buy(self, _ethAmount):
-        sgrAmount = self.contractAddressLocator.get('TransactionManager').buy(_ethAmount)
+        sgrAmount = self.transactionManager.buy(_ethAmount)
         self.ethTotal += _ethAmount
         self.sgrTotal +=  sgrAmount
         assert self.ethTotal <= MAX
@@ -16,13 +20,25 @@ class SGRToken():
         return sgrAmount
 
     def sell(self, _sgrAmount):
-        ethAmount = self.contractAddressLocator.get('TransactionManager').sell(_sgrAmount)
+        ethAmount = self.transactionManager.sell(_sgrAmount)
         self.ethTotal -=  ethAmount
         self.sgrTotal -= _sgrAmount
         assert self.ethTotal >= MIN
         assert self.sgrTotal >= MIN
         return ethAmount
 
+    def quoteBuy(self, _ethAmount):
+        sgrAmount = self.transactionManager.quoteBuy(_ethAmount)
+        assert self.ethTotal + _ethAmount <= MAX
+        assert self.sgrTotal + sgrAmount <= MAX
+        return sgrAmount
+
+    def quoteSell(self, _sgrAmount):
+        ethAmount = self.transactionManager.quoteSell(_sgrAmount)
+        assert self.ethTotal - ethAmount >= MIN
+        assert self.sgrTotal - _sgrAmount >= MIN
+        return ethAmount
+
     def mintSgrForSgnHolders(self, _sgrAmount):
         self.sgrTotal += _sgrAmount
         assert self.sgrTotal <= MAX
@@ -0,0 +1,25 @@
+from ContractAddressLocatorHolder import ContractAddressLocatorHolder
+
+'''
+    Advance the time of the minting point timers, and update the minting state upon every expired minting point
+    Each minting point costs a logarithmic number of operations when its timer is started and when it expires
+'''
+class SimulatedClock(ContractAddressLocatorHolder):
+    dependencies = {'mintingPointTimersManager': 'MintingPointTimersManager', 'mintManager': 'MintManager'};
+
+    def __init__(self, _contractAddressLocator):
+        self.contractAddressLocator = _contractAddressLocator;
+
+    def advance(self, _elapsed):
+        mintingPointTimersManager = self.mintingPointTimersManager;
+        mintingPointTimersManager.now += _elapsed;
+        if (len(mintingPointTimersManager.popExpired()) > 0):
+            self.updateMintingState();
+
+    def updateMintingState(self):
+        mintManager = self.mintManager;
+        while (mintManager.isMintingStateOutdated()):
+            mintManager.updateMintingState();
+
+    def time(self):
+        return self.mintingPointTimersManager.time();
@@ -21,11 +21,19 @@ class TransactionLimiter():
         self.totalSell = 0;
 
     def incTotalBuy(self, _amount):
+        self.checkTotalBuy(_amount);
         self.totalBuy += _amount;
-        if (self.totalBuy > self.totalSell):
-            assert(self.totalBuy - self.totalSell <= self.maxBuyDiff);
 
     def incTotalSell(self, _amount):
+        self.checkTotalSell(_amount);
         self.totalSell += _amount;
-        if (self.totalSell > self.totalBuy):
-            assert(self.totalSell - self.totalBuy <= self.maxSellDiff);
+
+    def checkTotalBuy(self, _amount):
+        totalBuy = self.totalBuy + _amount;
+        if (totalBuy > self.totalSell):
+            assert(totalBuy - self.totalSell <= self.maxBuyDiff);
+
+    def checkTotalSell(self, _amount):
+        totalSell = self.totalSell + _amount;
+        if (totalSell > self.totalBuy):
+            assert(totalSell - self.totalBuy <= self.maxSellDiff);
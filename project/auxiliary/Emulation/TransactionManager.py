@@ -1,17 +1,35 @@
-class TransactionManager():
+from ContractAddressLocatorHolder import ContractAddressLocatorHolder
+
+class TransactionManager(ContractAddressLocatorHolder):
+    dependencies = {'ethConverter': 'ETHConverter', 'reconciliationAdjuster': 'ReconciliationAdjuster', 'monetaryModel': 'MonetaryModel', 'transactionLimiter': 'TransactionLimiter'};
+
     def __init__(self, _contractAddressLocator):
         self.contractAddressLocator = _contractAddressLocator;
 
     def buy(self, _ethAmount):
-        sdrAmount = self.contractAddressLocator.get('ETHConverter').toSdrAmount(_ethAmount);
-        newAmount = self.contractAddressLocator.get('ReconciliationAdjuster').adjustBuy(sdrAmount);
-        sgrAmount = self.contractAddressLocator.get('MonetaryModel').buy(newAmount);
-        self.contractAddressLocator.get('TransactionLimiter').incTotalBuy(sdrAmount);
+        sdrAmount = self.ethConverter.toSdrAmount(_ethAmount);
+        newAmount = self.reconciliationAdjuster.adjustBuy(sdrAmount);
+        sgrAmount = self.monetaryModel.buy(newAmount);
+        self.transactionLimiter.incTotalBuy(sdrAmount);
         return sgrAmount;
 
     def sell(self, _sgrAmount):
-        sdrAmount = self.contractAddressLocator.get('MonetaryModel').sell(_sgrAmount);
-        newAmount = self.contractAddressLocator.get('ReconciliationAdjuster').adjustSell(sdrAmount);
-        ethAmount = self.contractAddressLocator.get('ETHConverter').toEthAmount(newAmount);
-        self.contractAddressLocator.get('TransactionLimiter').incTotalSell(sdrAmount);
+        sdrAmount = self.monetaryModel.sell(_sgrAmount);
+        newAmount = self.reconciliationAdjuster.adjustSell(sdrAmount);
+        ethAmount = self.ethConverter.toEthAmount(newAmount);
+        self.transactionLimiter.incTotalSell(sdrAmount);
+        return ethAmount;
+
+    def quoteBuy(self, _ethAmount):
+        sdrAmount = self.ethConverter.toSdrAmount(_ethAmount);
+        newAmount = self.reconciliationAdjuster.adjustBuy(sdrAmount);
+        sgrAmount = self.monetaryModel.quoteBuy(newAmount);
+        self.transactionLimiter.checkTotalBuy(sdrAmount);
+        return sgrAmount;
+
+    def quoteSell(self, _sgrAmount):
+        sdrAmount = self.monetaryModel.quoteSell(_sgrAmount);
+        newAmount = self.reconciliationAdjuster.adjustSell(sdrAmount);
+        ethAmount = self.ethConverter.toEthAmount(newAmount);
+        self.transactionLimiter.checkTotalSell(sdrAmount);
         return ethAmount;
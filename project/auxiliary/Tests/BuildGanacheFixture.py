@@ -0,0 +1,9 @@
+import Config
+
+
+from Common.Utils.UserInput import read
+from Common.GanacheFixture import build
+from Common.SGRTokenTradeSolidity import deploy
+
+
+build(read(default=10),Config.Logger(),deploy)
\ No newline at end of file
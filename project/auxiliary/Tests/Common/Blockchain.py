@@ -1,10 +1,28 @@
+import asyncio
 from web3 import Web3
 from web3 import HTTPProvider
+from eth_abi import decode_abi
+from requests import post
+from requests import HTTPError
+from os import getenv
 from os.path import dirname
-from json import loads
+from json import loads,dumps
+from urllib.parse import urlsplit
+from collections import deque
 
 
-web3 = Web3(HTTPProvider('http://127.0.0.1:8545',request_kwargs={'timeout':60}))
+ENDPOINT_URI   = 'http://127.0.0.1:8545'
+REQUEST_KWARGS = {'timeout':60}
+
+
+'''
+    Return the maximum number of requests in flight (0 for the synchronous client), as configured in the environment when called
+'''
+def asyncConcurrency():
+    return int(getenv('ASYNC_CONCURRENCY','0'))
+
+
+web3 = Web3(HTTPProvider(ENDPOINT_URI,request_kwargs=REQUEST_KWARGS))
 
 
 transaction = {
@@ -14,14 +32,20 @@ transaction = {
 }
 
 
+ARTIFACTS_PATH = dirname(dirname(dirname(dirname(__file__))))+'/build/artifacts/'
+
+
 class Contract():
     owner = transaction['from']
-    def __init__(self,moduleName,args=[]):
-        path = dirname(dirname(dirname(dirname(__file__))))+'/build/artifacts/'
-        abi = open(path+moduleName+'.abi').read()
-        bin = open(path+moduleName+'.bin').read()
+    '''
+        Deploy a new contract, or attach to the contract already deployed at the given address
+    '''
+    def __init__(self,moduleName,args=[],address=None):
+        abi = open(ARTIFACTS_PATH+moduleName+'.abi').read()
+        bin = open(ARTIFACTS_PATH+moduleName+'.bin').read()
+        self.moduleName = moduleName
         self.contract = web3.eth.contract(abi=loads(abi),bytecode=bin)
-        self.address  = web3.eth.getTransactionReceipt(self.contract.deploy(transaction,args))['contractAddress']
+        self.address  = address if address else web3.eth.getTransactionReceipt(self.contract.deploy(transaction,args))['contractAddress']
     def balance(self):
         return web3.eth.getBalance(self.address)
     def getter(self,extension={}):
@@ -30,6 +54,40 @@ class Contract():
         return self.contract(self.address).transact({**transaction,**extension})
     def tester(self,extension={}):
         return self.contract(self.address).estimateGas({**transaction,**extension})
+    def batcher(self,extension={}):
+        return Batch(self,extension)
+    '''
+        Send every (function name, args) as an 'eth_call' within a single JSON-RPC batch, and return the outputs in the same order
+        An error reply (for the entire batch or for any of its calls) is raised as a ValueError, the same as web3 does
+    '''
+    def batchCall(self,calls,extension={}):
+        batch = [
+            {'jsonrpc':'2.0','id':id,'method':'eth_call','params':[self.callObject(name,args,extension),'latest']}
+            for id,(name,args) in enumerate(calls)
+        ]
+        reply = post(ENDPOINT_URI,json=batch,**REQUEST_KWARGS).json()
+        if type(reply) is dict and 'error' in reply:
+            raise ValueError(reply['error'])
+        assert type(reply) is list,'illegal batch reply: {}'.format(reply)
+        responses = {response.get('id'):response for response in reply}
+        assert len(reply) == len(calls) and all(id in responses for id in range(len(calls))),'the batch reply does not match the {} calls: {}'.format(len(calls),sorted(responses,key=str))
+        outputs = []
+        for id,(name,args) in enumerate(calls):
+            if 'error' in responses[id]:
+                raise ValueError(responses[id]['error'])
+            outputs.append(self.decodeOutput(name,responses[id]['result']))
+        return outputs
+    async def asyncCall(self,client,name,args,extension={}):
+        return self.decodeOutput(name,await client.request('eth_call',[self.callObject(name,args,extension),'latest']))
+    async def asyncEstimateGas(self,client,name,args,extension={}):
+        return int(await client.request('eth_estimateGas',[self.callObject(name,args,extension)]),16)
+    def callObject(self,name,args,extension={}):
+        params = {key:Web3.toHex(value) if type(value) is int else value for key,value in {**transaction,**extension}.items()}
+        return {**params,'to':self.address,'data':self.contract.encodeABI(fn_name=name,args=args)}
+    def decodeOutput(self,name,result):
+        types = [output['type'] for output in next(item['outputs'] for item in self.contract.abi if item.get('type') == 'function' and item['name'] == name)]
+        values = decode_abi(types,Web3.toBytes(hexstr=result))
+        return values[0] if len(values) == 1 else list(values)
     def decode(hash,index,params):
         event = {}
         index1 = 1
@@ -43,5 +101,147 @@ class Contract():
                 event[param['name']] = int(log['data'][index2:index2+param['size']//4],16)
                 index2 += param['size']//4
         return event
+    def gasUsed(hash):
+        return web3.eth.getTransactionReceipt(hash)['gasUsed']
     def jump(seconds):
         web3.providers[0].make_request('evm_increaseTime',[seconds])
+    '''
+        Capture the state of the chain, and return an identifier which can be reverted to (only once) with 'revert'
+    '''
+    def snapshot():
+        return web3.providers[0].make_request('evm_snapshot',[])['result']
+    def revert(snapshotId):
+        assert web3.providers[0].make_request('evm_revert',[snapshotId])['result']
+
+
+'''
+    Collect function calls instead of executing them (every call returns its index), and execute them all at once
+'''
+class Batch():
+    def __init__(self,contract,extension={}):
+        self.contract  = contract
+        self.extension = extension
+        self.calls     = []
+    def __getattr__(self,name):
+        return lambda *args: self.add(name,args)
+    def add(self,name,args):
+        self.calls.append((name,args))
+        return len(self.calls)-1
+    def execute(self):
+        calls,self.calls = self.calls,[]
+        return self.contract.batchCall(calls,self.extension) if calls else []
+
+
+'''
+    Return every function call as (function name, args) instead of executing it
+'''
+class Deferred():
+    def __getattr__(self,name):
+        return lambda *args: (name,args)
+
+
+'''
+    Send JSON-RPC requests over persistent (keep-alive) connections, with at most the given number of requests in flight
+    Connecting, and sending a request until its response has been received, are each limited to the timeout of the synchronous client
+    A pooled connection which the node has closed in the meantime (e.g. after its keep-alive timeout) is replaced by a new connection, and the request is sent once again
+'''
+class AsyncClient():
+    def __init__(self,concurrency=None,uri=ENDPOINT_URI,timeout=REQUEST_KWARGS['timeout']):
+        concurrency = asyncConcurrency() if concurrency is None else concurrency
+        assert concurrency >= 1,'the number of requests in flight must be positive'
+        url = urlsplit(uri)
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.path = url.path or '/'
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.id = 0
+        self.connections = []
+    async def __aenter__(self):
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+    async def __aexit__(self,exceptionType,exceptionValue,traceback):
+        while self.connections:
+            reader,writer = self.connections.pop()
+            writer.close()
+    async def request(self,method,params):
+        self.id += 1
+        body = dumps({'jsonrpc':'2.0','id':self.id,'method':method,'params':params}).encode()
+        head = 'POST {} HTTP/1.1\r\nHost: {}:{}\r\nContent-Type: application/json\r\nContent-Length: {}\r\nConnection: keep-alive\r\n\r\n'
+        message = head.format(self.path,self.host,self.port,len(body)).encode()+body
+        async with self.semaphore:
+            content = None
+            if self.connections:
+                try:
+                    content = await self.send(*self.connections.pop(),message)
+                except ConnectionError:
+                    pass
+            if content is None:
+                content = await self.send(*await self.connect(),message)
+        response = loads(content)
+        if 'error' in response:
+            raise ValueError(response['error'])
+        return response['result']
+    async def connect(self):
+        return await asyncio.wait_for(asyncio.open_connection(self.host,self.port),self.timeout)
+    async def send(self,reader,writer,message):
+        try:
+            writer.write(message)
+            headers,content = await asyncio.wait_for(exchange(reader,writer),self.timeout)
+        except BaseException:
+            writer.close()
+            raise
+        if headers.get('connection') == 'close':
+            writer.close()
+        else:
+            self.connections.append((reader,writer))
+        return content
+
+
+async def exchange(reader,writer):
+    await writer.drain()
+    return await receive(reader)
+
+
+'''
+    A connection closed before the status line has been received is raised as a ConnectionError (the request can be sent again),
+    and a status other than 200 is raised as an HTTPError, the same as the synchronous client does
+'''
+async def receive(reader):
+    status = await reader.readline()
+    if not status:
+        raise ConnectionResetError('the connection has been closed by the node')
+    if status.split()[1:2] != [b'200']:
+        raise HTTPError('illegal HTTP status: {}'.format(status.decode().strip()))
+    headers = {}
+    line = await reader.readline()
+    while line.strip():
+        name,value = line.decode().split(':',1)
+        headers[name.strip().lower()] = value.strip().lower()
+        line = await reader.readline()
+    if headers.get('transfer-encoding') == 'chunked':
+        content = b''
+        size = int((await reader.readline()).split(b';')[0],16)
+        while size > 0:
+            content += await reader.readexactly(size)
+            await reader.readline()
+            size = int((await reader.readline()).split(b';')[0],16)
+        await reader.readline()
+    else:
+        content = await reader.readexactly(int(headers['content-length']))
+    return headers,content
+
+
+'''
+    Yield the outputs of the given coroutines in order, while up to the given number of them are running ahead
+'''
+async def pipeline(coroutines,window=None):
+    window = asyncConcurrency() if window is None else window
+    pending = deque()
+    for coroutine in coroutines:
+        pending.append(asyncio.ensure_future(coroutine))
+        await asyncio.sleep(0)
+        if len(pending) >= window:
+            yield await pending.popleft()
+    while pending:
+        yield await pending.popleft()
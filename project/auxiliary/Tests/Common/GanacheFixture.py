@@ -0,0 +1,94 @@
+import os
+from hashlib import sha256
+from json import dump,load
+from Common.Blockchain import Contract
+from Common.Blockchain import ARTIFACTS_PATH
+from Common.IntervalLoader import initialize
+from Common.IntervalTable import intervalLists
+
+
+'''
+    Fixture format (a directory):
+    - The ganache database, in the 'db' subdirectory (see 'RunGanache.py')
+    - A manifest file which maps the name of every deployed contract to its module name and address
+    - The manifest also holds the timeout of the timers manager, and digests of the interval table and of every contract artifact
+'''
+
+
+GANACHE_FIXTURE = os.getenv('GANACHE_FIXTURE','')
+
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def digest(data):
+    return sha256(data).hexdigest()
+
+
+def getIntervalsDigest():
+    return digest(repr([list(intervalList) for intervalList in intervalLists]).encode())
+
+
+def getArtifactDigest(moduleName):
+    with open(ARTIFACTS_PATH+moduleName+'.bin','rb') as fileDesc:
+        return digest(fileDesc.read())
+
+
+'''
+    Return the manifest of the fixture given by the GANACHE_FIXTURE environment variable, or None if the fixture has not been built
+'''
+def readManifest():
+    fileName = os.path.join(GANACHE_FIXTURE,MANIFEST_FILE)
+    if not GANACHE_FIXTURE or not os.path.exists(fileName):
+        return None
+    with open(fileName) as fileDesc:
+        manifest = load(fileDesc)
+    assert manifest['intervals'] == getIntervalsDigest(),'the fixture was built with a different interval table'
+    for entry in manifest['contracts'].values():
+        assert entry['artifact'] == getArtifactDigest(entry['module']),'the fixture was built with a different {} artifact'.format(entry['module'])
+    return manifest
+
+
+manifest = readManifest()
+snapshotId = None
+
+
+'''
+    Deploy the contracts with the given function, and write the manifest of the fixture
+    Ganache should be running on the database of the fixture, so that the deployed contracts persist along with it
+'''
+def build(timeout,logger,deploy):
+    assert GANACHE_FIXTURE and not manifest,'the fixture must be given and must not have been built'
+    contracts = deploy(logger,timeout)
+    with open(os.path.join(GANACHE_FIXTURE,MANIFEST_FILE),'w') as fileDesc:
+        dump({
+            'timeout'  :timeout,
+            'intervals':getIntervalsDigest(),
+            'contracts':{name:{'module':contract.moduleName,'address':contract.address,'artifact':getArtifactDigest(contract.moduleName)} for name,contract in contracts.items()},
+        },fileDesc,indent=4)
+    logger.info('Fixture built with {} contracts'.format(len(contracts)))
+
+
+'''
+    Return the contracts of the fixture if it has been built with the given timeout, or None otherwise
+    The chain is reverted to its initial state on every call except for the first one
+'''
+def restore(timeout):
+    global snapshotId
+    if not manifest or manifest['timeout'] != timeout:
+        return None
+    if snapshotId is not None:
+        Contract.revert(snapshotId)
+    snapshotId = Contract.snapshot()
+    return {name:Contract(entry['module'],address=entry['address']) for name,entry in manifest['contracts'].items()}
+
+
+'''
+    Return the (initialized and locked) model data source of the fixture, or deploy and initialize a new one
+'''
+def getModelDataSource(logger):
+    if manifest:
+        return Contract('ModelDataSource',address=manifest['contracts']['modelDataSource']['address'])
+    modelDataSource = Contract('ModelDataSource',[])
+    initialize(modelDataSource,logger)
+    return modelDataSource
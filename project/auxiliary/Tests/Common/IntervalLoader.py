@@ -0,0 +1,81 @@
+import os
+from Common.Blockchain import Contract
+from Common.IntervalTable import intervalLists
+
+
+MAX_INTERVAL_INPUT_LENGTH = 32 # the length of every array input of 'BatchSetModelDataSource.setIntervals'
+MAX_INTERVALS_PER_BATCH   = MAX_INTERVAL_INPUT_LENGTH-1 # the number of intervals must be lower than the length of the arrays
+BATCH_GAS_LIMIT           = int(os.getenv('BATCH_GAS_LIMIT','8000000')) # maximum gas per 'setIntervals' transaction
+READ_BATCH_SIZE           = 1000 # number of 'getInterval' calls per JSON-RPC batch
+
+
+def getEntries():
+    return [[m,n,list(intervalLists[m][n])] for m in range(len(intervalLists)) for n in range(len(intervalLists[m]))]
+
+
+'''
+    Return the arguments of 'setIntervals' for the given entries, with every array padded with zeros
+'''
+def pack(entries):
+    arrays = zip(*[[m,n,*interval] for m,n,interval in entries])
+    return [len(entries)]+[list(array)+[0]*(MAX_INTERVAL_INPUT_LENGTH-len(entries)) for array in arrays]
+
+
+'''
+    Deploy a 'BatchSetModelDataSource' contract and transfer the ownership of the given model data source to it
+'''
+def claim(modelDataSource):
+    batchSetModelDataSource = Contract('BatchSetModelDataSource',[modelDataSource.address])
+    modelDataSource.setter().transferOwnership(batchSetModelDataSource.address)
+    batchSetModelDataSource.setter().claimOwnershipModelDataSource()
+    return batchSetModelDataSource
+
+
+'''
+    Set every interval with as few 'setIntervals' transactions as possible, and return the total gas used
+    The number of intervals in each transaction is reduced until its estimated gas is within BATCH_GAS_LIMIT
+'''
+def load(batchSetModelDataSource,logger):
+    entries  = getEntries()
+    index    = 0
+    numOfTxs = 0
+    totalGas = 0
+    while index < len(entries):
+        count = min(MAX_INTERVALS_PER_BATCH,len(entries)-index)
+        estimatedGas = batchSetModelDataSource.tester().setIntervals(*pack(entries[index:index+count]))
+        while estimatedGas > BATCH_GAS_LIMIT and count > 1:
+            count = max(1,count*BATCH_GAS_LIMIT//estimatedGas)
+            estimatedGas = batchSetModelDataSource.tester().setIntervals(*pack(entries[index:index+count]))
+        assert estimatedGas <= BATCH_GAS_LIMIT,'a single interval exceeds the gas limit'
+        gas = Contract.gasUsed(batchSetModelDataSource.setter().setIntervals(*pack(entries[index:index+count])))
+        logger.debug('Set intervals {} to {}: gas = {}, gas per interval = {}'.format(index,index+count-1,gas,gas//count))
+        index    += count
+        numOfTxs += 1
+        totalGas += gas
+    logger.info('Set {} intervals in {} transactions: gas = {}, gas per interval = {}'.format(len(entries),numOfTxs,totalGas,totalGas//len(entries)))
+    return totalGas
+
+
+'''
+    Read every interval back within a few JSON-RPC batches, and return whether they are all equal to the interval table
+'''
+def verify(modelDataSource):
+    entries = getEntries()
+    batch = modelDataSource.batcher()
+    for index in range(0,len(entries),READ_BATCH_SIZE):
+        chunk = entries[index:index+READ_BATCH_SIZE]
+        for m,n,interval in chunk:
+            batch.getInterval(m,n)
+        if batch.execute() != [interval for m,n,interval in chunk]:
+            return False
+    return True
+
+
+'''
+    Set every interval in the given model data source, and lock it
+'''
+def initialize(modelDataSource,logger):
+    batchSetModelDataSource = claim(modelDataSource)
+    load(batchSetModelDataSource,logger)
+    assert verify(modelDataSource),'the model data source does not match the interval table'
+    batchSetModelDataSource.setter().lockModelDataSource()
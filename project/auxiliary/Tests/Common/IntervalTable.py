@@ -0,0 +1,87 @@
+import os
+from mmap import mmap,ACCESS_READ
+
+
+'''
+    Binary interval table format:
+    - A header of two words: the number of rows and the number of columns
+    - The intervals in row-major order, each one as six words: minN, maxN, minR, maxR, alpha, beta
+    Every word is a 256-bit big-endian unsigned integer
+    Rows shorter than the number of columns are padded with empty (all-zero) intervals
+'''
+
+
+WORD_SIZE      = 32
+HEADER_SIZE    = 2*WORD_SIZE
+INTERVAL_SIZE  = 6*WORD_SIZE
+EMPTY_INTERVAL = [0,0,0,0,0,0]
+
+
+def write(fileDesc,intervalLists):
+    rowCount = len(intervalLists)
+    colCount = max([len(intervalList) for intervalList in intervalLists])
+    fileDesc.write(b''.join(word.to_bytes(WORD_SIZE,'big') for word in [rowCount,colCount]))
+    for intervalList in intervalLists:
+        for interval in intervalList+[EMPTY_INTERVAL]*(colCount-len(intervalList)):
+            fileDesc.write(b''.join(word.to_bytes(WORD_SIZE,'big') for word in interval))
+
+
+class IntervalTable():
+    '''
+        Map the file into memory, and decode every row only on its first access
+        The object can be used instead of the nested lists in 'Common.ModelDataSource'
+    '''
+    def __init__(self,fileName):
+        with open(fileName,'rb') as fileDesc:
+            self.buffer = mmap(fileDesc.fileno(),0,access=ACCESS_READ)
+        self.rowCount = self.getWord(0)
+        self.colCount = self.getWord(WORD_SIZE)
+        self.intervalLists = [None]*self.rowCount
+        assert len(self.buffer) == HEADER_SIZE+self.rowCount*self.colCount*INTERVAL_SIZE
+    def getWord(self,offset):
+        return int.from_bytes(self.buffer[offset:offset+WORD_SIZE],'big')
+    def getInterval(self,row,col):
+        offset = HEADER_SIZE+(row*self.colCount+col)*INTERVAL_SIZE
+        return [self.getWord(offset+n*WORD_SIZE) for n in range(6)]
+    def getIntervalList(self,row):
+        intervalList = [self.getInterval(row,col) for col in range(self.colCount)]
+        while intervalList and intervalList[-1] == EMPTY_INTERVAL:
+            intervalList.pop()
+        return intervalList
+    def __len__(self):
+        return self.rowCount
+    def __getitem__(self,row):
+        if self.intervalLists[row] is None:
+            self.intervalLists[row] = self.getIntervalList(row)
+        return self.intervalLists[row]
+    def __iter__(self):
+        return (self[row] for row in range(self.rowCount))
+
+
+tables = {}
+
+
+def load(fileName):
+    if fileName not in tables:
+        tables[fileName] = IntervalTable(fileName)
+    return tables[fileName]
+
+
+'''
+    Use the binary table given by the INTERVAL_TABLE environment variable, or the nested lists in 'Common.ModelDataSource'
+    Processes forked after loading the table share the same mapped file
+'''
+if os.getenv('INTERVAL_TABLE',''):
+    intervalLists = load(os.getenv('INTERVAL_TABLE'))
+else:
+    from Common.ModelDataSource import intervalLists
+
+
+def initialize(modelDataSource, logger):
+    mLen = len(str(len(intervalLists)))
+    nLen = max([len(str(len(intervalList))) for intervalList in intervalLists])
+    for m in range(len(intervalLists)):
+        for n in range(len(intervalLists[m])):
+            modelDataSource.setInterval(m, n, *intervalLists[m][n])
+            logger.debug('Set interval {0:{1}} {2:{3}}'.format(m, mLen, n, nLen))
+    modelDataSource.lock()
@@ -1,7 +1,16 @@
+import os
+from pickle import dump,load
+from contextlib import nullcontext
+from multiprocessing import get_context
 from decimal import Decimal as dec
 from ModelCalculator import FixedPoint
 
 
+NUM_OF_PROCESSES  = int(os.getenv('NUM_OF_PROCESSES','1'))
+CHECKPOINT_FILE   = os.getenv('CHECKPOINT_FILE','')
+CHECKPOINT_PERIOD = int(os.getenv('CHECKPOINT_PERIOD','10')) # number of values of 'a' between checkpoints
+
+
 def run(resolution,logger):
     MIN_BASE =  1
     MAX_BASE = 20
@@ -11,27 +20,76 @@ def run(resolution,logger):
     aRange,b = range(resolution*MIN_BASE,resolution*MAX_BASE),resolution
     cRange,d = range(resolution*MIN_EXPO,resolution*MAX_EXPO),resolution
 
-    minRatio   = 1
-    testCount  = 0
+    progress,minRatio,argMin = resume(resolution)
+    testCount  = progress*len(cRange)
     numOfTests = len(aRange)*len(cRange)
 
     logger.info('Starting {} tests...'.format(numOfTests))
-    for a in aRange:
-        for c in cRange:
-            try:
+    if progress > 0:
+        logger.info('Resuming from test {}...'.format(testCount))
+    with get_context('fork').Pool(NUM_OF_PROCESSES) if NUM_OF_PROCESSES > 1 else nullcontext() as pool:
+        tasks = ((a,b,cRange,d) for a in aRange[progress:])
+        results = pool.imap(sweep,tasks) if pool else map(sweep,tasks)
+        for a,outputs in zip(aRange[progress:],results):
+            for c,curRatio,violation in outputs:
                 testCount += 1
-                output1 = FixedPoint.pow(FixedPoint.FIXED_ONE*a,b,c,d)
-                output2 = FixedPoint.FIXED_ONE*(dec(a)/dec(b))**(dec(c)/dec(d))
-                curRatio = output1/output2 if output1 != output2 else 1
-                minRatio = min(minRatio,curRatio)
+                if curRatio is None:
+                    logger.periodic(testCount,numOfTests,'curRatio = {:.40f}, minRatio = {:.40f} (illegal input)'.format(0,minRatio))
+                    continue
+                if curRatio < minRatio:
+                    minRatio,argMin = curRatio,(a,c)
                 logger.periodic(testCount,numOfTests,'curRatio = {:.40f}, minRatio = {:.40f}'.format(curRatio,minRatio))
-                if output1 > output2:
+                if violation:
                     logger.error('Emulation error:')
                     logger.error('a = {}'.format(a))
                     logger.error('b = {}'.format(b))
                     logger.error('c = {}'.format(c))
                     logger.error('d = {}'.format(d))
                     return
-            except AssertionError:
-                logger.periodic(testCount,numOfTests,'curRatio = {:.40f}, minRatio = {:.40f} (illegal input)'.format(0,minRatio))
+            progress += 1
+            if CHECKPOINT_FILE and progress % CHECKPOINT_PERIOD == 0:
+                save(resolution,progress,minRatio,argMin)
+    if CHECKPOINT_FILE and os.path.exists(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE)
     logger.info('Done: minRatio = {:.40f}'.format(minRatio))
+    if argMin:
+        logger.info('minRatio input: a = {}, b = {}, c = {}, d = {}'.format(argMin[0],b,argMin[1],d))
+
+
+'''
+    Compare every power (a/b)^(c/d) for a single value of 'a', and stop at the first one which exceeds the accurate value
+    Return (c, ratio, violation) for every value of 'c' which has been evaluated, with a ratio of None for an illegal input
+'''
+def sweep(args):
+    a,b,cRange,d = args
+    outputs = []
+    for c in cRange:
+        try:
+            output1 = FixedPoint.pow(FixedPoint.FIXED_ONE*a,b,c,d)
+            output2 = FixedPoint.FIXED_ONE*(dec(a)/dec(b))**(dec(c)/dec(d))
+            outputs.append((c,output1/output2 if output1 != output2 else 1,output1 > output2))
+            if output1 > output2:
+                break
+        except AssertionError:
+            outputs.append((c,None,False))
+    return outputs
+
+
+'''
+    Checkpoint format:
+    - A pickled tuple (resolution, progress, minRatio, argMin)
+    - The progress is the number of values of 'a' which have been completed
+'''
+def save(resolution,progress,minRatio,argMin):
+    with open(CHECKPOINT_FILE+'.tmp','wb') as fileDesc:
+        dump((resolution,progress,minRatio,argMin),fileDesc)
+    os.replace(CHECKPOINT_FILE+'.tmp',CHECKPOINT_FILE)
+
+
+def resume(resolution):
+    if not CHECKPOINT_FILE or not os.path.exists(CHECKPOINT_FILE):
+        return 0,1,None
+    with open(CHECKPOINT_FILE,'rb') as fileDesc:
+        checkpointResolution,progress,minRatio,argMin = load(fileDesc)
+    assert checkpointResolution == resolution
+    return progress,minRatio,argMin
@@ -1,30 +1,90 @@
+import os
+from random import seed
+from multiprocessing import get_context
 from ModelCalculator import FixedPoint
 from ModelCalculator import FloatPoint
-from Common.ModelDataSource import intervalLists
+from Common.IntervalTable import intervalLists
+
+
+NUM_OF_PROCESSES = int(os.getenv('NUM_OF_PROCESSES','1'))
+RANDOM_SEED      = os.getenv('RANDOM_SEED','')
 
 
 def run(numOfTestsPerInterval,logger,conversionHandler,distributionFunc):
-    intervals  = [[minN,maxN,minR,maxR,alpha,beta] for minN,maxN,minR,maxR,alpha,beta in sum(intervalLists,[])]
+    if RANDOM_SEED:
+        seed(int(RANDOM_SEED))
+
+    intervals  = [((row,col),[minN,maxN,minR,maxR,alpha,beta]) for row,intervalList in enumerate(intervalLists) for col,(minN,maxN,minR,maxR,alpha,beta) in enumerate(intervalList)]
     numOfTests = numOfTestsPerInterval*len(intervals)
-    testCount  = 0
 
+    # the inputs are drawn in the parent process, in the same order regardless of the number of processes
+    tasks = ((conversionHandler,indexes,interval,distributionFunc(*conversionHandler.inputRange(*interval[:4]),numOfTestsPerInterval)) for indexes,interval in intervals)
+
+    logger.info('Starting {} tests...'.format(numOfTests))
+    if NUM_OF_PROCESSES > 1:
+        with get_context('fork').Pool(NUM_OF_PROCESSES) as pool:
+            minRatio,minInput,maxRatio,maxInput = mergeResults(pool.imap(compare,tasks),Progress(numOfTests,logger))
+    else:
+        progress = Progress(numOfTests,logger)
+        minRatio,minInput,maxRatio,maxInput = mergeResults((compare(task,progress) for task in tasks),None)
+    logger.info('Done: minRatio = {:.40f}, maxRatio = {:.40f}'.format(minRatio,maxRatio))
+    logger.info('minRatio input: row = {}, col = {}, value = {}'.format(*minInput))
+    logger.info('maxRatio input: row = {}, col = {}, value = {}'.format(*maxInput))
+
+
+class Progress():
+    '''
+        Log the running extremes periodically, either after every test (when the tests are run in this process) or after every interval
+    '''
+    def __init__(self,numOfTests,logger):
+        self.numOfTests = numOfTests
+        self.logger     = logger
+        self.testCount  = 0
+        self.minRatio   = float('+inf')
+        self.maxRatio   = float('-inf')
+    def __call__(self,count,minRatio,maxRatio):
+        self.testCount += count
+        self.minRatio   = min(self.minRatio,minRatio)
+        self.maxRatio   = max(self.maxRatio,maxRatio)
+        self.logger.periodic(self.testCount,self.numOfTests,'minRatio = {:.40f}, maxRatio = {:.40f}'.format(self.minRatio,self.maxRatio))
+
+
+'''
+    Compare the fixed-point output and the float-point output for every input in a single interval, and report every test to the given progress if any
+    Return the indexes of the interval and the number of inputs, along with the minimum and maximum ratios and the first input which yields each one of them
+'''
+def compare(args,progress=None):
+    conversionHandler,indexes,(minN,maxN,minR,maxR,alpha,beta),inputs = args
     module1 = conversionHandler(FixedPoint)
     module2 = conversionHandler(FloatPoint)
+    module1.SetIntervalTypeInternally(alpha,beta)
+    module2.SetIntervalTypeInternally(alpha,beta)
+    minRatio,minV = float('+inf'),None
+    maxRatio,maxV = float('-inf'),None
+    outputs1 = module1.outputBatch(inputs,minN,maxN,minR,maxR,alpha,beta)
+    outputs2 = module2.outputBatch(inputs,minN,maxN,minR,maxR,alpha,beta)
+    for newV,output1,output2 in zip(inputs,outputs1,outputs2):
+        curRatio = output1/output2 if output1 != output2 else 1
+        if curRatio < minRatio:
+            minRatio,minV = curRatio,newV
+        if curRatio > maxRatio:
+            maxRatio,maxV = curRatio,newV
+        if progress:
+            progress(1,curRatio,curRatio)
+    return indexes,len(inputs),minRatio,minV,maxRatio,maxV
 
-    minRatio = float('+inf')
-    maxRatio = float('-inf')
 
-    logger.info('Starting {} tests...'.format(numOfTests))
-    for minN,maxN,minR,maxR,alpha,beta in intervals:
-        module1.SetIntervalTypeInternally(alpha,beta)
-        module2.SetIntervalTypeInternally(alpha,beta)
-        minV,maxV = conversionHandler.inputRange(minN,maxN,minR,maxR)
-        for newV in distributionFunc(minV,maxV,numOfTestsPerInterval):
-            testCount += 1
-            output1 = module1.outputFunc(newV,minN,maxN,minR,maxR,alpha,beta)
-            output2 = module2.outputFunc(newV,minN,maxN,minR,maxR,alpha,beta)
-            curRatio = output1/output2 if output1 != output2 else 1
-            minRatio = min(minRatio,curRatio)
-            maxRatio = max(maxRatio,curRatio)
-            logger.periodic(testCount,numOfTests,'minRatio = {:.40f}, maxRatio = {:.40f}'.format(minRatio,maxRatio))
-    logger.info('Done: minRatio = {:.40f}, maxRatio = {:.40f}'.format(minRatio,maxRatio))
+'''
+    Merge the extremes of every interval in the order of the intervals, keeping the first input which yields each extreme, and report every interval to the given progress if any
+'''
+def mergeResults(results,progress):
+    minRatio,minInput = float('+inf'),None
+    maxRatio,maxInput = float('-inf'),None
+    for (row,col),count,curMinRatio,minV,curMaxRatio,maxV in results:
+        if curMinRatio < minRatio:
+            minRatio,minInput = curMinRatio,(row,col,minV)
+        if curMaxRatio > maxRatio:
+            maxRatio,maxInput = curMaxRatio,(row,col,maxV)
+        if progress:
+            progress(count,curMinRatio,curMaxRatio)
+    return minRatio,minInput,maxRatio,maxInput
@@ -1,34 +1,102 @@
+import os
+import asyncio
 from ModelCalculator import FixedPoint
 from Common.Blockchain import Contract
-from Common.ModelDataSource import intervalLists
+from Common.Blockchain import Deferred
+from Common.Blockchain import AsyncClient
+from Common.Blockchain import pipeline
+from Common.Blockchain import asyncConcurrency
+from Common.IntervalTable import intervalLists
+
+
+BATCH_SIZE = int(os.getenv('BATCH_SIZE','1000')) # number of samples per JSON-RPC batch (0 for a request per sample)
 
 
 def run(numOfTestsPerInterval,logger,conversionHandler,distributionFunc):
     intervals  = [[minN,maxN,minR,maxR,alpha,beta] for minN,maxN,minR,maxR,alpha,beta in sum(intervalLists,[])]
     numOfTests = numOfTestsPerInterval*len(intervals)
+
+    contract = Contract('ModelCalculator')
+
+    logger.info('Starting {} tests...'.format(numOfTests))
+    if asyncConcurrency() > 0:
+        passed = asyncio.run(runAsync(numOfTestsPerInterval,logger,conversionHandler,distributionFunc,intervals,contract))
+    else:
+        passed = runSync(numOfTestsPerInterval,logger,conversionHandler,distributionFunc,intervals,contract)
+    if passed:
+        logger.info('Done')
+
+
+def runSync(numOfTestsPerInterval,logger,conversionHandler,distributionFunc,intervals,contract):
+    numOfTests = numOfTestsPerInterval*len(intervals)
     testCount  = 0
 
+    batch = contract.batcher() if BATCH_SIZE > 0 else None
+    chunkSize = BATCH_SIZE if batch else 1
+
     module1 = conversionHandler(FixedPoint)
-    module2 = conversionHandler(Contract('ModelCalculator').getter())
+    module2 = conversionHandler(batch if batch else contract.getter())
 
-    logger.info('Starting {} tests...'.format(numOfTests))
     for minN,maxN,minR,maxR,alpha,beta in intervals:
         module1.SetIntervalTypeInternally(alpha,beta)
-        module2.SetIntervalTypeInternally(alpha,beta)
+        module2.SetIntervalTypeExternally(contract.getter(),alpha,beta)
         minV,maxV = conversionHandler.inputRange(minN,maxN,minR,maxR)
-        for newV in distributionFunc(minV,maxV,numOfTestsPerInterval):
+        samples = distributionFunc(minV,maxV,numOfTestsPerInterval)
+        for index in range(0,len(samples),chunkSize):
+            chunk = samples[index:index+chunkSize]
+            outputs = [module2.outputFunc(newV,minN,maxN,minR,maxR,alpha,beta) for newV in chunk]
+            if batch:
+                outputs = batch.execute()
+            for newV,output2 in zip(chunk,outputs):
+                testCount += 1
+                output1 = module1.outputFunc(newV,minN,maxN,minR,maxR,alpha,beta)
+                logger.periodic(testCount,numOfTests,'python = {}, solidity = {}'.format(output1,output2))
+                if output1 != output2:
+                    report(logger,minN,maxN,minR,maxR,alpha,beta,newV)
+                    return False
+    return True
+
+
+'''
+    Keep up to ASYNC_CONCURRENCY requests in flight, and compute every Python output while the following requests are pending
+'''
+async def runAsync(numOfTestsPerInterval,logger,conversionHandler,distributionFunc,intervals,contract):
+    numOfTests = numOfTestsPerInterval*len(intervals)
+    testCount  = 0
+
+    module1 = conversionHandler(FixedPoint)
+    module2 = conversionHandler(Deferred())
+
+    async with AsyncClient() as client:
+        trivials = await asyncio.gather(*[contract.asyncCall(client,'isTrivialInterval',[alpha,beta]) for minN,maxN,minR,maxR,alpha,beta in intervals])
+
+        async def sample(interval,newV,call):
+            return interval,newV,await contract.asyncCall(client,*call)
+
+        def samples():
+            for (minN,maxN,minR,maxR,alpha,beta),trivial in zip(intervals,trivials):
+                module2.trivial = trivial
+                minV,maxV = conversionHandler.inputRange(minN,maxN,minR,maxR)
+                for newV in distributionFunc(minV,maxV,numOfTestsPerInterval):
+                    yield sample((minN,maxN,minR,maxR,alpha,beta),newV,module2.outputFunc(newV,minN,maxN,minR,maxR,alpha,beta))
+
+        async for (minN,maxN,minR,maxR,alpha,beta),newV,output2 in pipeline(samples()):
             testCount += 1
+            module1.SetIntervalTypeInternally(alpha,beta)
             output1 = module1.outputFunc(newV,minN,maxN,minR,maxR,alpha,beta)
-            output2 = module2.outputFunc(newV,minN,maxN,minR,maxR,alpha,beta)
             logger.periodic(testCount,numOfTests,'python = {}, solidity = {}'.format(output1,output2))
             if output1 != output2:
-                logger.error('Emulation error:')
-                logger.error('minN  = {}'.format(minN ))
-                logger.error('maxN  = {}'.format(maxN ))
-                logger.error('minR  = {}'.format(minR ))
-                logger.error('maxR  = {}'.format(maxR ))
-                logger.error('alpha = {}'.format(alpha))
-                logger.error('beta  = {}'.format(beta ))
-                logger.error('newV  = {}'.format(newV ))
-                return
-    logger.info('Done')
+                report(logger,minN,maxN,minR,maxR,alpha,beta,newV)
+                return False
+    return True
+
+
+def report(logger,minN,maxN,minR,maxR,alpha,beta,newV):
+    logger.error('Emulation error:')
+    logger.error('minN  = {}'.format(minN ))
+    logger.error('maxN  = {}'.format(maxN ))
+    logger.error('minR  = {}'.format(minR ))
+    logger.error('maxR  = {}'.format(maxR ))
+    logger.error('alpha = {}'.format(alpha))
+    logger.error('beta  = {}'.format(beta ))
+    logger.error('newV  = {}'.format(newV ))
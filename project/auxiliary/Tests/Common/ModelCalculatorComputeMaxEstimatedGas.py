@@ -1,17 +1,34 @@
+import asyncio
 from ModelCalculator import FixedPoint
 from Common.Blockchain import Contract
-from Common.ModelDataSource import intervalLists
+from Common.Blockchain import Deferred
+from Common.Blockchain import AsyncClient
+from Common.Blockchain import pipeline
+from Common.Blockchain import asyncConcurrency
+from Common.IntervalTable import intervalLists
 
 
 def run(numOfTestsPerInterval,logger,conversionHandler,distributionFunc):
     intervals  = [[minN,maxN,minR,maxR,alpha,beta] for minN,maxN,minR,maxR,alpha,beta in sum(intervalLists,[])]
     numOfTests = numOfTestsPerInterval*len(intervals)
+
+    contract = Contract('ModelCalculator')
+
+    logger.info('Starting {} tests...'.format(numOfTests))
+    if asyncConcurrency() > 0:
+        maxGas = asyncio.run(runAsync(numOfTestsPerInterval,logger,conversionHandler,distributionFunc,intervals,contract))
+    else:
+        maxGas = runSync(numOfTestsPerInterval,logger,conversionHandler,distributionFunc,intervals,contract)
+    logger.info('Done:  maxGas = {}'.format(maxGas))
+
+
+def runSync(numOfTestsPerInterval,logger,conversionHandler,distributionFunc,intervals,contract):
+    numOfTests = numOfTestsPerInterval*len(intervals)
     testCount  = 0
 
     maxGas = 0
-    module = conversionHandler(Contract('ModelCalculator').tester())
+    module = conversionHandler(contract.tester())
 
-    logger.info('Starting {} tests...'.format(numOfTests))
     for minN,maxN,minR,maxR,alpha,beta in intervals:
         module.SetIntervalTypeExternally(FixedPoint,alpha,beta)
         minV,maxV = conversionHandler.inputRange(minN,maxN,minR,maxR)
@@ -20,4 +37,29 @@ def run(numOfTestsPerInterval,logger,conversionHandler,distributionFunc):
             curGas = module.outputFunc(newV,minN,maxN,minR,maxR,alpha,beta)
             maxGas = max(maxGas,curGas)
             logger.periodic(testCount,numOfTests,'curGas = {}, maxGas = {}'.format(curGas,maxGas))
-    logger.info('Done:  maxGas = {}'.format(maxGas))
+    return maxGas
+
+
+'''
+    Keep up to ASYNC_CONCURRENCY gas estimations in flight, and draw the following inputs while they are pending
+'''
+async def runAsync(numOfTestsPerInterval,logger,conversionHandler,distributionFunc,intervals,contract):
+    numOfTests = numOfTestsPerInterval*len(intervals)
+    testCount  = 0
+
+    maxGas = 0
+    module = conversionHandler(Deferred())
+
+    async with AsyncClient() as client:
+        def samples():
+            for minN,maxN,minR,maxR,alpha,beta in intervals:
+                module.SetIntervalTypeExternally(FixedPoint,alpha,beta)
+                minV,maxV = conversionHandler.inputRange(minN,maxN,minR,maxR)
+                for newV in distributionFunc(minV,maxV,numOfTestsPerInterval):
+                    yield contract.asyncEstimateGas(client,*module.outputFunc(newV,minN,maxN,minR,maxR,alpha,beta))
+
+        async for curGas in pipeline(samples()):
+            testCount += 1
+            maxGas = max(maxGas,curGas)
+            logger.periodic(testCount,numOfTests,'curGas = {}, maxGas = {}'.format(curGas,maxGas))
+    return maxGas
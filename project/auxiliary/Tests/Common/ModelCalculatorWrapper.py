@@ -1,5 +1,6 @@
 class Convert():
     def __init__(self,modelCalculator):
+        self.modelCalculator   = modelCalculator
         self.isTrivialInterval = modelCalculator.isTrivialInterval
     def SetIntervalTypeInternally(self,alpha,beta):
         self.trivial = self.isTrivialInterval(alpha,beta)
@@ -16,6 +17,8 @@ class ConvertR2N(Convert):
         return minR,maxR
     def outputFunc(self,newR,minN,maxN,minR,maxR,alpha,beta):
         return self.getValN(newR-minR,maxN,maxR) if self.trivial else self.getNewN(newR,minR,minN,alpha,beta)
+    def outputBatch(self,newRList,minN,maxN,minR,maxR,alpha,beta):
+        return [self.getValN(newR-minR,maxN,maxR) for newR in newRList] if self.trivial else self.modelCalculator.getNewNBatch(newRList,minR,minN,alpha,beta)
 
 
 class ConvertN2R(Convert):
@@ -27,3 +30,5 @@ class ConvertN2R(Convert):
         return minN,maxN
     def outputFunc(self,newN,minN,maxN,minR,maxR,alpha,beta):
         return self.getValR(newN-minN,maxR,maxN) if self.trivial else self.getNewR(newN,minN,minR,alpha,beta)
+    def outputBatch(self,newNList,minN,maxN,minR,maxR,alpha,beta):
+        return [self.getValR(newN-minN,maxR,maxN) for newN in newNList] if self.trivial else self.modelCalculator.getNewRBatch(newNList,minN,minR,alpha,beta)
@@ -1,13 +1,3 @@
-def initialize(modelDataSource, logger):
-    mLen = len(str(len(intervalLists)))
-    nLen = max([len(str(len(intervalList))) for intervalList in intervalLists])
-    for m in range(len(intervalLists)):
-        for n in range(len(intervalLists[m])):
-            modelDataSource.setInterval(m, n, *intervalLists[m][n])
-            logger.debug('Set interval {0:{1}} {2:{3}}'.format(m, mLen, n, nLen))
-    modelDataSource.lock()
-
-
 intervalLists = [[[0, 2000000000000000000000000, 0, 2000000000000000000000000, 10000000000000000000000000000000000, 0]],
                  [[2000000000000000000000000, 8795000000000000000000000, 2000000000000000000000000,
                    9999973633264202263409397, 10588660000000000000000000000000000, 294330000],
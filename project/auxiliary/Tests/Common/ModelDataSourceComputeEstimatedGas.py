@@ -1,27 +1,36 @@
 from Common.Blockchain import Contract
-from Common.ModelDataSource import intervalLists
+from Common.IntervalTable import intervalLists
+from Common.IntervalLoader import claim
+from Common.IntervalLoader import load
+from Common.IntervalLoader import pack
+from Common.IntervalLoader import verify
+from Common.IntervalLoader import getEntries
 
 
 def run(logger):
+    logger.info('Setting intervals one by one...')
+    singleGas = runSingle(logger)
+    logger.info('Setting intervals in batches...')
+    batchGas = runBatch(logger)
+    logger.info('Total gas: one by one = {}, in batches = {}, ratio = {:.4f}'.format(singleGas,batchGas,batchGas/singleGas))
+
+
+def runSingle(logger):
     module = Contract('ModelDataSource')
 
     setter = module.setter()
-    getter = module.getter()
-    tester = module.tester()
 
     mLen = len(str(len(intervalLists)))
     nLen = max([len(str(len(intervalList))) for intervalList in intervalLists])
 
     totalGas = 0
-    logger.info('Setting intervals...')
     for m in range(len(intervalLists)):
         for n in range(len(intervalLists[m])):
-            gas = tester.setInterval(m,n,*intervalLists[m][n])
-            setter.setInterval(m,n,*intervalLists[m][n])
-            assert getter.getInterval(m,n) == intervalLists[m][n]
+            gas = Contract.gasUsed(setter.setInterval(m,n,*intervalLists[m][n]))
             logger.debug('Set interval {0:{1}} {2:{3}}: gas = {4}'.format(m,mLen,n,nLen,gas))
             totalGas += gas
     logger.info('Total gas = {}'.format(totalGas))
+    assert verify(module)
 
     setter.lock()
     try:
@@ -29,3 +38,22 @@ def run(logger):
         logger.error('Lock failure')
     except ValueError:
         logger.info('Lock success')
+    return totalGas
+
+
+def runBatch(logger):
+    module = Contract('ModelDataSource')
+
+    batchModule = claim(module)
+    setter = batchModule.setter()
+
+    totalGas = load(batchModule,logger)
+    assert verify(module)
+
+    setter.lockModelDataSource()
+    try:
+        setter.setIntervals(*pack(getEntries()[:1]))
+        logger.error('Lock failure')
+    except ValueError:
+        logger.info('Lock success')
+    return totalGas
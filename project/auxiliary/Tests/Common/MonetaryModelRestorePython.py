@@ -0,0 +1,51 @@
+from Common.MonetaryModelTradePython import init
+from Common.Utils.CommandCompiler import records
+from Common.Utils.CommandCompiler import INIT,BUY,SELL
+
+
+'''
+    Replay the sequence on one model, and after every trade restore another model from the state of the first one
+    Then check that both models are in the same state, and that the next trade yields the same output on both of them
+'''
+def run(fileName,logger,modelCalculator,priceBandCalculator):
+    commands   = list(records(fileName))
+    numOfTests = len([opcode for opcode,elapsed,amount in commands if opcode in [BUY,SELL]])
+    testCount  = 0
+
+    logger.info('Starting {} tests...'.format(numOfTests))
+    for opcode,elapsed,amount in commands:
+        if opcode == INIT:
+            source = init(logger,modelCalculator,priceBandCalculator,amount)
+            target = init(logger,modelCalculator,priceBandCalculator,amount)
+        elif opcode in [BUY,SELL]:
+            testCount += 1
+            outputs = [trade(opcode,elapsed,amount,*model) for model in [source,target]]
+            assert outputs[0] == outputs[1],'test {}: output {} != {}'.format(testCount,*outputs)
+            restore(*source,*target)
+            assert getState(*source) == getState(*target),'test {}: state {} != {}'.format(testCount,getState(*source),getState(*target))
+            logger.periodic(testCount,numOfTests,'row = {}, col = {}'.format(*source[2].intervalIterator.getCurrentIntervalIndexes()))
+    logger.info('Done')
+
+
+def trade(opcode,elapsed,amount,mintingPointTimersManager,monetaryModelState,monetaryModel):
+    mintingPointTimersManager.now += elapsed
+    return monetaryModel.buy(amount) if opcode == BUY else monetaryModel.sell(amount)
+
+
+'''
+    Restore the target model from the totals, the row and the timer values of the source model
+'''
+def restore(sourceTimersManager,sourceModelState,sourceModel,targetTimersManager,targetModelState,targetModel):
+    rowNum = sourceModel.intervalIterator.getCurrentIntervalIndexes()[0]
+    timerValues = [sourceTimersManager.timestamps[_id].value for _id in range(1,rowNum+1)]
+    targetTimersManager.now = sourceTimersManager.now
+    targetModel.restore(sourceModelState.getSdrTotal(),sourceModelState.getSgrTotal(),rowNum,timerValues)
+
+
+def getState(mintingPointTimersManager,monetaryModelState,monetaryModel):
+    return (
+        monetaryModelState.getSdrTotal(),
+        monetaryModelState.getSgrTotal(),
+        monetaryModel.intervalIterator.getCurrentIntervalIndexes(),
+        [(timestamp.valid,timestamp.value) for timestamp in mintingPointTimersManager.timestamps],
+    )
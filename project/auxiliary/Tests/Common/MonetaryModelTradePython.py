@@ -7,38 +7,66 @@ from MonetaryModelState         import MonetaryModelState
 from MonetaryModel              import MonetaryModel
 
 
-from Common.ModelDataSource import initialize
-from Common.Utils.CommandReader import load
-from Common.Utils.UnitConverter import dec2wei
+from Common.IntervalTable import initialize
+from Common.StateTrace import StateTrace
+from Common.StateTrace import STATE_TRACE_DIR
+from Common.Utils.CommandCompiler import records
+from Common.Utils.CommandCompiler import INIT,BUY,SELL,INFO
 from Common.Utils.UnitConverter import wei2dec
+from Common.Utils.TraceRecorder import TraceRecorder
+from Common.Utils.TraceRecorder import Event
+
+
+BUY_TRACE       = 0
+SELL_TRACE      = 1
+INFO_TRACE      = 2
+UNDEFINED_TRACE = 3
+
+
+TRACE_EVENTS = [
+    Event('buy: {:.2f} SDR ==> {:.2f} SGR',wei2dec),
+    Event('sell: {:.2f} SGR ==> {:.2f} SDR',wei2dec),
+    Event('SDR = {:.2f}\nSGR = {:.2f}',wei2dec),
+    Event('Undefined operation'),
+]
 
 
 def run(fileName,logger,modelCalculator,priceBandCalculator):
     logger.info('Executing sequence...')
-    for command in load(fileName):
-        if command['operation'] == 'init':
-            mintingPointTimersManager,monetaryModelState,monetaryModel = init(logger,modelCalculator,priceBandCalculator,command['timeout'])
-        elif command['operation'] == 'buy':
-            mintingPointTimersManager.now += command['elapsed']
-            sdrAmount = dec2wei(command['amount'])
-            sgrAmount = monetaryModel.buy(sdrAmount)
-            logger.debug('buy: {:.2f} SDR ==> {:.2f} SGR'.format(wei2dec(sdrAmount),wei2dec(sgrAmount)))
-        elif command['operation'] == 'sell':
-            mintingPointTimersManager.now += command['elapsed']
-            sgrAmount = dec2wei(command['amount'])
-            sdrAmount = monetaryModel.sell(sgrAmount)
-            logger.debug('sell: {:.2f} SGR ==> {:.2f} SDR'.format(wei2dec(sgrAmount),wei2dec(sdrAmount)))
-        elif command['operation'] == 'info':
-            logger.debug('SDR = {:.2f}'.format(wei2dec(monetaryModelState.getSdrTotal())))
-            logger.debug('SGR = {:.2f}'.format(wei2dec(monetaryModelState.getSgrTotal())))
-        else:
-            logger.debug('Undefined operation')
+    stateTrace = StateTrace(STATE_TRACE_DIR) if STATE_TRACE_DIR else None
+    with TraceRecorder(logger,TRACE_EVENTS) as trace:
+        for opcode,elapsed,amount in records(fileName):
+            if opcode == INIT:
+                mintingPointTimersManager,monetaryModelState,monetaryModel = init(logger,modelCalculator,priceBandCalculator,amount)
+                if stateTrace:
+                    stateTrace.attach(monetaryModel.contractAddressLocator)
+                    stateTrace.record(opcode)
+            elif opcode == BUY:
+                mintingPointTimersManager.now += elapsed
+                sdrAmount = amount
+                sgrAmount = monetaryModel.buy(sdrAmount)
+                trace.record(BUY_TRACE,sdrAmount,sgrAmount)
+                if stateTrace:
+                    stateTrace.record(opcode,sgrAmount)
+            elif opcode == SELL:
+                mintingPointTimersManager.now += elapsed
+                sgrAmount = amount
+                sdrAmount = monetaryModel.sell(sgrAmount)
+                trace.record(SELL_TRACE,sgrAmount,sdrAmount)
+                if stateTrace:
+                    stateTrace.record(opcode,sgrAmount)
+            elif opcode == INFO:
+                trace.record(INFO_TRACE,monetaryModelState.getSdrTotal(),monetaryModelState.getSgrTotal())
+            else:
+                trace.record(UNDEFINED_TRACE)
+    if stateTrace:
+        stateTrace.close()
     logger.info('Done')
 
 
 def init(logger,modelCalculator,priceBandCalculator,timeout):
     contractAddressLocator = ContractAddressLocator()
-    modelDataSource             = ModelDataSource            ()
+    modelDataSource             = ModelDataSource            (contractAddressLocator)
     mintingPointTimersManager            = MintingPointTimersManager           (contractAddressLocator,timeout)
     mintManager            = MintManager           (contractAddressLocator)
     intervalIterator       = IntervalIterator      (contractAddressLocator)
@@ -53,6 +81,7 @@ def init(logger,modelCalculator,priceBandCalculator,timeout):
     contractAddressLocator.set('IntervalIterator',intervalIterator)
     contractAddressLocator.set('MonetaryModelState'  ,monetaryModelState  )
     contractAddressLocator.set('MonetaryModel'       ,monetaryModel       )
+    contractAddressLocator.bind()
 
     initialize(modelDataSource,logger)
 
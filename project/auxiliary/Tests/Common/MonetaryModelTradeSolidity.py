@@ -1,9 +1,11 @@
 from Common.Blockchain import Web3
 from Common.Blockchain import Contract
-from Common.ModelDataSource import initialize
-from Common.Utils.CommandReader import load
-from Common.Utils.UnitConverter import dec2wei
+from Common.GanacheFixture import getModelDataSource
+from Common.Utils.CommandCompiler import records
+from Common.Utils.CommandCompiler import INIT,BUY,SELL,INFO
 from Common.Utils.UnitConverter import wei2dec
+from Common.Utils.TraceRecorder import TraceRecorder
+from Common.Utils.TraceRecorder import Event
 
 
 eventParams = [
@@ -16,26 +18,40 @@ def unzip(tuples):
     return [Web3.toHex(text=tuple[0]) for tuple in tuples],[tuple[1] for tuple in tuples]
 
 
+BUY_TRACE       = 0
+SELL_TRACE      = 1
+INFO_TRACE      = 2
+UNDEFINED_TRACE = 3
+
+
+TRACE_EVENTS = [
+    Event('buy: {:.2f} SDR ==> {:.2f} SGR',wei2dec),
+    Event('sell: {:.2f} SGR ==> {:.2f} SDR',wei2dec),
+    Event('SDR = {:.2f}\nSGR = {:.2f}',wei2dec),
+    Event('Undefined operation'),
+]
+
+
 def run(fileName,logger):
     logger.info('Executing sequence...')
-    for command in load(fileName):
-        if command['operation'] == 'init':
-            monetaryModelState,monetaryModel = init(logger,command['timeout'])
-        elif command['operation'] == 'buy':
-            Contract.jump(command['elapsed'])
-            sdrAmount = dec2wei(command['amount'])
-            sgrAmount = Contract.decode(monetaryModel.setter().buy(sdrAmount),0,eventParams)['output']
-            logger.debug('buy: {:.2f} SDR ==> {:.2f} SGR'.format(wei2dec(sdrAmount),wei2dec(sgrAmount)))
-        elif command['operation'] == 'sell':
-            Contract.jump(command['elapsed'])
-            sgrAmount = dec2wei(command['amount'])
-            sdrAmount = Contract.decode(monetaryModel.setter().sell(sgrAmount),0,eventParams)['output']
-            logger.debug('sell: {:.2f} SGR ==> {:.2f} SDR'.format(wei2dec(sgrAmount),wei2dec(sdrAmount)))
-        elif command['operation'] == 'info':
-            logger.debug('SDR = {:.2f}'.format(wei2dec(monetaryModelState.getter().getSdrTotal())))
-            logger.debug('SGR = {:.2f}'.format(wei2dec(monetaryModelState.getter().getSgrTotal())))
-        else:
-            logger.debug('Undefined operation')
+    with TraceRecorder(logger,TRACE_EVENTS) as trace:
+        for opcode,elapsed,amount in records(fileName):
+            if opcode == INIT:
+                monetaryModelState,monetaryModel = init(logger,amount)
+            elif opcode == BUY:
+                Contract.jump(elapsed)
+                sdrAmount = amount
+                sgrAmount = Contract.decode(monetaryModel.setter().buy(sdrAmount),0,eventParams)['output']
+                trace.record(BUY_TRACE,sdrAmount,sgrAmount)
+            elif opcode == SELL:
+                Contract.jump(elapsed)
+                sgrAmount = amount
+                sdrAmount = Contract.decode(monetaryModel.setter().sell(sgrAmount),0,eventParams)['output']
+                trace.record(SELL_TRACE,sgrAmount,sdrAmount)
+            elif opcode == INFO:
+                trace.record(INFO_TRACE,monetaryModelState.getter().getSdrTotal(),monetaryModelState.getter().getSgrTotal())
+            else:
+                trace.record(UNDEFINED_TRACE)
     logger.info('Done')
 
 
@@ -43,7 +59,7 @@ def init(logger,timeout):
     contractAddressLocatorProxy = Contract('ContractAddressLocatorProxy',[                                           ])
     modelCalculator             = Contract('ModelCalculator'            ,[                                           ])
     priceBandCalculator            = Contract('PriceBandCalculator'           ,[                                           ])
-    modelDataSource                  = Contract('ModelDataSource'                 ,[                                           ])
+    modelDataSource                  = getModelDataSource(logger)
     mintingPointTimersManager                 = Contract('MintingPointTimersManager'                ,[contractAddressLocatorProxy.address,timeout])
     mintManager                 = Contract('MintManager'                ,[contractAddressLocatorProxy.address        ])
     intervalIterator            = Contract('IntervalIterator'           ,[contractAddressLocatorProxy.address        ])
@@ -63,6 +79,4 @@ def init(logger,timeout):
 
     contractAddressLocatorProxy.setter().upgrade(contractAddressLocator.address)
 
-    initialize(modelDataSource.setter(),logger)
-
     return monetaryModelState,monetaryModel
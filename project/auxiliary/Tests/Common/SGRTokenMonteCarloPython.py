@@ -0,0 +1,152 @@
+from heapq import heappush,heapreplace
+from random import Random
+from fractions import Fraction
+from multiprocessing import get_context
+from ModelCalculator.FixedPoint import A_B_SCALE
+
+
+from Common.SGRTokenTradePython import init
+from Common.StateTrace import FeeRecorder
+from Common.WorkloadGenerator import createSources
+from Common.WorkloadGenerator import generate
+from Common.Utils.CommandReader import load
+
+
+PATH_LENGTH    = 10
+PERCENTILES    = [5,50,95]
+RESERVOIR_SIZE = 1000
+
+
+class Aggregate():
+    '''
+        Keep a running count, sum, minimum and maximum, along with a fixed-size sample of the values for the percentiles
+        The sample holds the values with the lowest keys, so neither the sample nor the exact sum depend on the order in which the results arrive
+    '''
+    def __init__(self,size=RESERVOIR_SIZE):
+        self.size      = size
+        self.count     = 0
+        self.total     = Fraction(0)
+        self.min       = float('+inf')
+        self.max       = float('-inf')
+        self.reservoir = []
+    def add(self,value,key):
+        self.count += 1
+        self.total += Fraction(value)
+        self.min    = min(self.min,value)
+        self.max    = max(self.max,value)
+        if len(self.reservoir) < self.size:
+            heappush(self.reservoir,(-key,value))
+        elif -key > self.reservoir[0][0]:
+            heapreplace(self.reservoir,(-key,value))
+    def mean(self):
+        return float(self.total/self.count)
+    def percentile(self,p):
+        values = sorted(value for key,value in self.reservoir)
+        return values[min(len(values)*p//100,len(values)-1)]
+    def __str__(self):
+        return 'mean = {:.6f}, min = {:.6f}, max = {:.6f}, '.format(self.mean(),self.min,self.max)+', '.join('p{} = {:.6f}'.format(p,self.percentile(p)) for p in PERCENTILES)
+
+
+class FeeCounter():
+    '''
+        Pass every call through to the SGR token, and add up the fee taken by the price band calculator in every trade
+        The fee recorder is reset right before each trade and read right after it, so the fees of quotes (and of rejected trades) are not counted
+    '''
+    def __init__(self,sgrToken,feeRecorder):
+        self.sgrToken    = sgrToken
+        self.feeRecorder = feeRecorder
+        self.total       = 0
+    def __getattr__(self,name):
+        return getattr(self.sgrToken,name)
+    def buy(self,ethAmount):
+        self.feeRecorder.fee = 0
+        sgrAmount = self.sgrToken.buy(ethAmount)
+        self.total += self.feeRecorder.fee
+        return sgrAmount
+    def sell(self,sgrAmount):
+        self.feeRecorder.fee = 0
+        ethAmount = self.sgrToken.sell(sgrAmount)
+        self.total += self.feeRecorder.fee
+        return ethAmount
+
+
+'''
+    The system wired before the pool is created, which every simulation forks (along with the interval table it shares)
+'''
+template = None
+
+
+def run(fileName,logger,modelCalculator,priceBandCalculator,ReconciliationAdjuster,ETHConverter):
+    global template
+    spec = load(fileName)
+    template = init(logger,modelCalculator,priceBandCalculator,ReconciliationAdjuster,ETHConverter,spec['timeout'])[1].contractAddressLocator
+    seeds = range(*spec['seeds'])
+    reserveRatio = Aggregate()
+    feeRevenue = Aggregate()
+    pricePath = [Aggregate() for n in range(PATH_LENGTH+1)]
+    logger.info('Starting {} simulations...'.format(len(seeds)))
+    with get_context('fork').Pool(spec.get('processes')) as pool:
+        for testCount,result in enumerate(pool.imap_unordered(simulate,[(seed,spec) for seed in seeds]),1):
+            key = getKey(result['seed'])
+            reserveRatio.add(result['reserveRatio'],key)
+            feeRevenue.add(result['feeRevenue'],key)
+            for aggregate,price in zip(pricePath,result['pricePath']):
+                aggregate.add(price,key)
+            logger.periodic(testCount,len(seeds),'seed = {}, reserve ratio = {:.6f}, fee revenue = {:.2f}'.format(result['seed'],result['reserveRatio'],result['feeRevenue']))
+    logger.info('Reserve ratio: {}'.format(reserveRatio))
+    logger.info('Fee revenue: {}'.format(feeRevenue))
+    for n,aggregate in enumerate(pricePath):
+        logger.info('Price after {}% of the commands: {}'.format(n*100//PATH_LENGTH,aggregate))
+
+
+'''
+    Run a single simulation, and return:
+    - The reserve ratio at the end (the ratio of the current interval at the SGR total of the model)
+    - The fee revenue at the end (the total SDR amount kept by the price band calculator)
+    - The price path (the ETH paid per SGR for buying a small amount), sampled at equal intervals
+'''
+def simulate(args):
+    seed,spec = args
+    contractAddressLocator = template.fork()
+    feeRecorder = FeeRecorder(contractAddressLocator.get('PriceBandCalculator'))
+    contractAddressLocator.set('PriceBandCalculator',feeRecorder)
+    mintingPointTimersManager = contractAddressLocator.get('MintingPointTimersManager')
+    monetaryModelState = contractAddressLocator.get('MonetaryModelState')
+    intervalIterator = contractAddressLocator.get('IntervalIterator')
+    sgrToken = contractAddressLocator.get('SGRToken')
+    feeCounter = FeeCounter(sgrToken,feeRecorder)
+    rnd = Random(seed)
+    arrivals,sizes = createSources(rnd,spec['timeout'],spec['arrival'],spec['size'],spec['crossingProbability'])
+    commands = generate(rnd,spec['count'],spec['timeout'],arrivals,sizes,spec['buyRatio'],spec['sellRatio'],mintingPointTimersManager,feeCounter)
+    period = max(spec['count']//PATH_LENGTH,1)
+    price = getPrice(sgrToken,1)
+    pricePath = [price]
+    for n,command in enumerate(commands):
+        if n > 0 and n % period == 0:
+            price = getPrice(sgrToken,price)
+            pricePath.append(price)
+    pricePath += [getPrice(sgrToken,price)]*(PATH_LENGTH+1-len(pricePath))
+    alpha,beta = intervalIterator.getCurrentIntervalCoefs()
+    return {
+        'seed'        :seed,
+        'reserveRatio':(alpha-beta*monetaryModelState.getSgrTotal())/A_B_SCALE,
+        'feeRevenue'  :feeCounter.total/10**18,
+        'pricePath'   :pricePath[:PATH_LENGTH+1],
+    }
+
+
+'''
+    Return the ETH paid per SGR for buying with 1 ETH, or the given price if the model cannot be bought any further
+'''
+def getPrice(sgrToken,price):
+    try:
+        return 10**18/float(sgrToken.quoteBuy(10**18))
+    except (AssertionError,IndexError,ZeroDivisionError):
+        return price
+
+
+'''
+    Return the key of the given seed in the samples of the aggregates, drawn independently of the simulation of that seed
+'''
+def getKey(seed):
+    return Random('sample{}'.format(seed)).random()
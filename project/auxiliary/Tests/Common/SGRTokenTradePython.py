@@ -1,3 +1,4 @@
+import os
 from ContractAddressLocator import ContractAddressLocator
 from ModelDataSource             import ModelDataSource
 from MintingPointTimersManager            import MintingPointTimersManager
@@ -8,34 +9,100 @@ from MonetaryModel              import MonetaryModel
 from TransactionLimiter     import TransactionLimiter    
 from TransactionManager     import TransactionManager    
 from SGRToken               import SGRToken              
+from SimulatedClock         import SimulatedClock        
+from ContractAddressLocatorHolder import ContractAddressLocatorHolder
 
 
-from Common.ModelDataSource import initialize
-from Common.Utils.CommandReader import load
-from Common.Utils.UnitConverter import dec2wei
+from Common.IntervalTable import initialize
+from Common.Snapshot import save
+from Common.Snapshot import restore
+from Common.StateTrace import StateTrace
+from Common.StateTrace import STATE_TRACE_DIR
+from Common.Utils.CommandCompiler import records
+from Common.Utils.CommandCompiler import INIT,BUY,SELL,INFO
 from Common.Utils.UnitConverter import wei2dec
+from Common.Utils.TraceRecorder import TraceRecorder
+from Common.Utils.TraceRecorder import Event
+
+
+CHECKPOINT_FILE   = os.getenv('CHECKPOINT_FILE','')
+CHECKPOINT_PERIOD = int(os.getenv('CHECKPOINT_PERIOD','100000'))
+SIMULATED_CLOCK   = os.getenv('SIMULATED_CLOCK','') == '1' # advance the time via 'SimulatedClock', which mints every expired minting point
+
+
+BUY_TRACE       = 0
+SELL_TRACE      = 1
+INFO_TRACE      = 2
+UNDEFINED_TRACE = 3
+
+
+TRACE_EVENTS = [
+    Event('buy: {:.2f} ETH ==> {:.2f} SGR',wei2dec),
+    Event('sell: {:.2f} SGR ==> {:.2f} ETH',wei2dec),
+    Event('ETH = {:.2f}\nSGR = {:.2f}',wei2dec),
+    Event('Undefined operation'),
+]
 
 
 def run(fileName,logger,modelCalculator,priceBandCalculator,ReconciliationAdjuster,ETHConverter):
     logger.info('Executing sequence...')
-    for command in load(fileName):
-        if command['operation'] == 'init':
-            mintingPointTimersManager,sgrToken = init(logger,modelCalculator,priceBandCalculator,ReconciliationAdjuster,ETHConverter,command['timeout'])
-        elif command['operation'] == 'buy':
-            mintingPointTimersManager.now += command['elapsed']
-            ethAmount = dec2wei(command['amount'])
-            sgrAmount = sgrToken.buy(ethAmount)
-            logger.debug('buy: {:.2f} ETH ==> {:.2f} SGR'.format(wei2dec(ethAmount),wei2dec(sgrAmount)))
-        elif command['operation'] == 'sell':
-            mintingPointTimersManager.now += command['elapsed']
-            sgrAmount = dec2wei(command['amount'])
-            ethAmount = sgrToken.sell(sgrAmount)
-            logger.debug('sell: {:.2f} SGR ==> {:.2f} ETH'.format(wei2dec(sgrAmount),wei2dec(ethAmount)))
-        elif command['operation'] == 'info':
-            logger.debug('ETH = {:.2f}'.format(wei2dec(sgrToken.ethTotal)))
-            logger.debug('SGR = {:.2f}'.format(wei2dec(sgrToken.sgrTotal)))
-        else:
-            logger.debug('Undefined operation')
+    resume = CHECKPOINT_FILE and os.path.exists(CHECKPOINT_FILE)
+    resumePosition = 0
+    stateTrace = None
+    with TraceRecorder(logger,TRACE_EVENTS) as trace:
+        for position,(opcode,elapsed,amount) in enumerate(records(fileName)):
+            if position < resumePosition:
+                continue
+            if opcode == INIT:
+                mintingPointTimersManager,sgrToken = init(logger,modelCalculator,priceBandCalculator,ReconciliationAdjuster,ETHConverter,amount)
+                traceRows = 0
+                if resume:
+                    resume = False
+                    resumePosition,traceRows = restore(CHECKPOINT_FILE,sgrToken.contractAddressLocator)
+                    mintingPointTimersManager = sgrToken.contractAddressLocator.get('MintingPointTimersManager')
+                    sgrToken = sgrToken.contractAddressLocator.get('SGRToken')
+                    logger.info('Resuming from command {}...'.format(resumePosition))
+                clock = sgrToken.contractAddressLocator.get('SimulatedClock') if SIMULATED_CLOCK else None
+                if STATE_TRACE_DIR:
+                    # on resume, the rows written up to the checkpoint are kept and the trace is appended after them
+                    stateTrace = stateTrace or StateTrace(STATE_TRACE_DIR,traceRows)
+                    stateTrace.attach(sgrToken.contractAddressLocator)
+                if position < resumePosition:
+                    continue
+                if stateTrace:
+                    stateTrace.record(opcode)
+            elif opcode == BUY:
+                if clock:
+                    clock.advance(elapsed)
+                else:
+                    mintingPointTimersManager.now += elapsed
+                ethAmount = amount
+                sgrAmount = sgrToken.buy(ethAmount)
+                trace.record(BUY_TRACE,ethAmount,sgrAmount)
+                if stateTrace:
+                    stateTrace.record(opcode,sgrAmount,ethAmount)
+            elif opcode == SELL:
+                if clock:
+                    clock.advance(elapsed)
+                else:
+                    mintingPointTimersManager.now += elapsed
+                sgrAmount = amount
+                ethAmount = sgrToken.sell(sgrAmount)
+                trace.record(SELL_TRACE,sgrAmount,ethAmount)
+                if stateTrace:
+                    stateTrace.record(opcode,sgrAmount,ethAmount)
+            elif opcode == INFO:
+                trace.record(INFO_TRACE,sgrToken.ethTotal,sgrToken.sgrTotal)
+            else:
+                trace.record(UNDEFINED_TRACE)
+            if CHECKPOINT_FILE and (position+1) % CHECKPOINT_PERIOD == 0:
+                if stateTrace:
+                    stateTrace.flush()
+                save(CHECKPOINT_FILE,position+1,sgrToken.contractAddressLocator,stateTrace.rows if stateTrace else 0)
+    if CHECKPOINT_FILE and os.path.exists(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE)
+    if stateTrace:
+        stateTrace.close()
     logger.info('Done')
 
 
@@ -43,7 +110,7 @@ def init(logger,modelCalculator,priceBandCalculator,ReconciliationAdjuster,ETHCo
     contractAddressLocator = ContractAddressLocator()
     reconciliationAdjuster      = ReconciliationAdjuster     ()
     ethConverter   = ETHConverter  (contractAddressLocator)
-    modelDataSource             = ModelDataSource            ()
+    modelDataSource             = ModelDataSource            (contractAddressLocator)
     mintingPointTimersManager            = MintingPointTimersManager           (contractAddressLocator,timeout)
     mintManager            = MintManager           (contractAddressLocator)
     intervalIterator       = IntervalIterator      (contractAddressLocator)
@@ -66,7 +133,31 @@ def init(logger,modelCalculator,priceBandCalculator,ReconciliationAdjuster,ETHCo
     contractAddressLocator.set('TransactionLimiter'  ,transactionLimiter  )
     contractAddressLocator.set('TransactionManager'  ,transactionManager  )
     contractAddressLocator.set('SGRToken'            ,sgrToken            )
+    if SIMULATED_CLOCK:
+        contractAddressLocator.set('SimulatedClock'  ,SimulatedClock(contractAddressLocator)       )
+        contractAddressLocator.set('MintListener'    ,MintListener  (contractAddressLocator,logger))
+    contractAddressLocator.bind()
 
     initialize(modelDataSource,logger)
 
     return mintingPointTimersManager,sgrToken
+
+
+
+'''
+    Mint via the SGR token, after checking that the minting points are minted in the order of their deadlines, and only once they have expired
+'''
+class MintListener(ContractAddressLocatorHolder):
+    dependencies = {'mintingPointTimersManager':'MintingPointTimersManager','mintManager':'MintManager','sgrToken':'SGRToken'}
+    def __init__(self,contractAddressLocator,logger):
+        self.contractAddressLocator = contractAddressLocator
+        self.logger = logger
+        self.deadline = 0
+    def mintSgrForSgnHolders(self,amount):
+        mintingPointTimersManager = self.mintingPointTimersManager
+        index = self.mintManager.getIndex()+1
+        deadline = mintingPointTimersManager.timestamps[index].value+mintingPointTimersManager.timeout
+        assert self.deadline <= deadline < mintingPointTimersManager.time(),'minting point {} is out of order'.format(index)
+        self.deadline = deadline
+        self.logger.debug('Minting point {}: deadline = {}, amount = {}'.format(index,deadline,amount))
+        self.sgrToken.mintSgrForSgnHolders(amount)
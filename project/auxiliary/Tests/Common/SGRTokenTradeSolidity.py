@@ -1,9 +1,12 @@
 from Common.Blockchain import Web3
 from Common.Blockchain import Contract
-from Common.ModelDataSource import initialize
-from Common.Utils.CommandReader import load
-from Common.Utils.UnitConverter import dec2wei
+from Common.GanacheFixture import restore
+from Common.GanacheFixture import getModelDataSource
+from Common.Utils.CommandCompiler import records
+from Common.Utils.CommandCompiler import INIT,BUY,SELL,INFO
 from Common.Utils.UnitConverter import wei2dec
+from Common.Utils.TraceRecorder import TraceRecorder
+from Common.Utils.TraceRecorder import Event
 
 
 eventParams = [
@@ -17,36 +20,59 @@ def unzip(tuples):
     return [Web3.toHex(text=tuple[0]) for tuple in tuples],[tuple[1] for tuple in tuples]
 
 
+BUY_TRACE       = 0
+SELL_TRACE      = 1
+INFO_TRACE      = 2
+UNDEFINED_TRACE = 3
+
+
+TRACE_EVENTS = [
+    Event('buy: {:.2f} ETH ==> {:.2f} SGR',wei2dec),
+    Event('sell: {:.2f} SGR ==> {:.2f} ETH',wei2dec),
+    Event('ETH = {:.2f}\nSGR = {:.2f}',wei2dec),
+    Event('Undefined operation'),
+]
+
+
 def run(fileName,logger):
     logger.info('Executing sequence...')
-    for command in load(fileName):
-        if command['operation'] == 'init':
-            sgrToken = init(logger,command['timeout'])
-        elif command['operation'] == 'buy':
-            Contract.jump(command['elapsed'])
-            ethAmount = dec2wei(command['amount'])
-            sgrAmount = Contract.decode(sgrToken.setter({'value':ethAmount}).exchange(),2,eventParams)['output']
-            logger.debug('buy: {:.2f} ETH ==> {:.2f} SGR'.format(wei2dec(ethAmount),wei2dec(sgrAmount)))
-        elif command['operation'] == 'sell':
-            Contract.jump(command['elapsed'])
-            sgrAmount = dec2wei(command['amount'])
-            ethAmount = Contract.decode(sgrToken.setter().transfer(sgrToken.address,sgrAmount),2,eventParams)['output']
-            logger.debug('sell: {:.2f} SGR ==> {:.2f} ETH'.format(wei2dec(sgrAmount),wei2dec(ethAmount)))
-        elif command['operation'] == 'info':
-            logger.debug('ETH = {:.2f}'.format(wei2dec(sgrToken.balance())))
-            logger.debug('SGR = {:.2f}'.format(wei2dec(sgrToken.getter().totalSupply())))
-        else:
-            logger.debug('Undefined operation')
+    with TraceRecorder(logger,TRACE_EVENTS) as trace:
+        for opcode,elapsed,amount in records(fileName):
+            if opcode == INIT:
+                sgrToken = init(logger,amount)
+            elif opcode == BUY:
+                Contract.jump(elapsed)
+                ethAmount = amount
+                sgrAmount = Contract.decode(sgrToken.setter({'value':ethAmount}).exchange(),2,eventParams)['output']
+                trace.record(BUY_TRACE,ethAmount,sgrAmount)
+            elif opcode == SELL:
+                Contract.jump(elapsed)
+                sgrAmount = amount
+                ethAmount = Contract.decode(sgrToken.setter().transfer(sgrToken.address,sgrAmount),2,eventParams)['output']
+                trace.record(SELL_TRACE,sgrAmount,ethAmount)
+            elif opcode == INFO:
+                trace.record(INFO_TRACE,sgrToken.balance(),sgrToken.getter().totalSupply())
+            else:
+                trace.record(UNDEFINED_TRACE)
     logger.info('Done')
 
 
 def init(logger,timeout):
+    contracts = restore(timeout)
+    if contracts:
+        logger.info('Using the fixture contracts...')
+    else:
+        contracts = deploy(logger,timeout)
+    return contracts['sgrToken']
+
+
+def deploy(logger,timeout):
     contractAddressLocatorProxy = Contract('ContractAddressLocatorProxy',[                                           ])
     modelCalculator             = Contract('ModelCalculator'            ,[                                           ])
     priceBandCalculator            = Contract('PriceBandCalculator'           ,[                                           ])
     reconciliationAdjuster           = Contract('ReconciliationAdjuster'          ,[                                           ])
     ethConverter        = Contract('ETHConverter'       ,[contractAddressLocatorProxy.address        ])
-    modelDataSource                  = Contract('ModelDataSource'                 ,[                                           ])
+    modelDataSource                  = getModelDataSource(logger)
     mintingPointTimersManager                 = Contract('MintingPointTimersManager'                ,[contractAddressLocatorProxy.address,timeout])
     mintManager                 = Contract('MintManager'                ,[contractAddressLocatorProxy.address        ])
     intervalIterator            = Contract('IntervalIterator'           ,[contractAddressLocatorProxy.address        ])
@@ -99,12 +125,11 @@ def init(logger,timeout):
 
     contractAddressLocatorProxy.setter().upgrade(contractAddressLocator.address)
 
-    initialize(modelDataSource.setter(),logger)
-
     authorizationDataSource.setter().accept(Contract.owner)
     buyWalletsTradingDataSource.setter().setAuthorizedExecutorsIdentifier(["BuyWalletsTLSGRTokenManager"])
     sellWalletsTradingDataSource.setter().setAuthorizedExecutorsIdentifier(["SellWalletsTLSGRTokenManager"])
 
     authorizationDataSource.setter().upsertOne(Contract.owner,1,True,2**256-1,2**256-1,0)
 
-    return sgrToken
+    # every contract deployed above, by name
+    return {name:contract for name,contract in locals().items() if isinstance(contract,Contract)}
@@ -0,0 +1,85 @@
+import os
+from pickle import dumps,loads,HIGHEST_PROTOCOL
+
+
+'''
+    Snapshot format (version 3):
+    - A pickled tuple (version, position, traceRows, components)
+    - The position is the number of commands executed before the snapshot was taken
+    - The trace rows are the number of state trace rows written before the snapshot was taken (see 'StateTrace.py')
+    - The components map every identifier to the values of the attributes listed below (in the same order)
+'''
+
+
+VERSION = 3
+
+
+ATTRIBUTES = {
+    'MonetaryModelState'       :['sdrTotal','sgrTotal'],
+    'IntervalIterator'         :['row','col'],
+    'MintingPointTimersManager':['now','timeout','timestamps'],
+    'MintManager'              :['index'],
+    'TransactionLimiter'       :['maxBuyDiff','maxSellDiff','sequenceNum','totalBuy','totalSell'],
+    'ETHConverter'             :['sequenceNum','highPriceN','highPriceD','lowPriceN','lowPriceD'],
+    'ReconciliationAdjuster'   :['sequenceNum','factorN','factorD'],
+    'SGRToken'                 :['ethTotal','sgrTotal'],
+}
+
+
+def encode(name,value):
+    if name == 'timestamps':
+        return [(timestamp.valid,timestamp.value) for timestamp in value]
+    return value
+
+
+def decode(component,name,value):
+    if name == 'timestamps':
+        return [type(component).Timestamp(valid,value) for valid,value in value]
+    return value
+
+
+'''
+    Return the state of every component registered in the given locator
+'''
+def capture(contractAddressLocator):
+    components = {}
+    for identifier,names in ATTRIBUTES.items():
+        if identifier in contractAddressLocator.registry:
+            component = contractAddressLocator.get(identifier)
+            components[identifier] = [encode(name,getattr(component,name)) for name in names]
+    return components
+
+
+'''
+    Create new instances of the components registered in the given locator, set them to the captured state, and register them instead
+    The stateless components (and the locked model data source) are kept, and bound components are re-resolved upon registration
+    The derived attributes of every component are reset, in order to be rebuilt from the captured state when needed
+'''
+def rewire(components,contractAddressLocator):
+    for identifier,values in components.items():
+        previous = contractAddressLocator.get(identifier)
+        component = type(previous).__new__(type(previous))
+        if 'contractAddressLocator' in vars(previous):
+            component.contractAddressLocator = contractAddressLocator
+        for name,value in zip(ATTRIBUTES[identifier],values):
+            setattr(component,name,decode(component,name,value))
+        for name,value in getattr(type(component),'derived',{}).items():
+            setattr(component,name,value)
+        contractAddressLocator.set(identifier,component)
+
+
+def save(fileName,position,contractAddressLocator,traceRows=0):
+    with open(fileName+'.tmp','wb') as fileDesc:
+        fileDesc.write(dumps((VERSION,position,traceRows,capture(contractAddressLocator)),HIGHEST_PROTOCOL))
+    os.replace(fileName+'.tmp',fileName)
+
+
+'''
+    Rewire the given locator from the snapshot file, and return the position and the number of state trace rows of the snapshot
+'''
+def restore(fileName,contractAddressLocator):
+    with open(fileName,'rb') as fileDesc:
+        version,position,traceRows,components = loads(fileDesc.read())
+    assert version == VERSION
+    rewire(components,contractAddressLocator)
+    return position,traceRows
@@ -0,0 +1,194 @@
+import os
+from json import dump,load
+from decimal import Decimal,getcontext
+
+
+'''
+    State trace format (a directory):
+    - A file per field, holding a little-endian 64-bit unsigned word (or several words) per row
+    - A wide value is split into several words, the least significant word first
+    - A wide field holds at least 4 words, or enough words for the coefficient of any decimal at the current precision
+    - A wide field also has an exponent file, holding a little-endian 64-bit signed word per row
+    - Every value is stored losslessly as coefficient * 10 ^ exponent (the exponent is 0 for every integer value)
+    - A manifest file which maps every field to its files and number of words, along with the number of rows
+    - The manifest is rewritten whenever a chunk is written, so the rows which it counts are readable even if the run has crashed
+    - A trace which is resumed from a checkpoint keeps the rows written before the checkpoint, and discards any rows written after it
+    - For example, numpy.memmap(fileName,dtype='<u8',mode='r')[:rows*words].reshape(rows,words) maps a field without copying it
+'''
+
+
+STATE_TRACE_DIR   = os.getenv('STATE_TRACE_DIR','')
+STATE_TRACE_CHUNK = int(os.getenv('STATE_TRACE_CHUNK','65536'))
+
+
+MANIFEST_FILE = 'manifest.json'
+WORD_SIZE     = 8
+WIDE_WORDS    = 4
+
+
+FIELDS = [
+    ('opcode'   ,1),
+    ('sdrTotal' ,4),
+    ('sgrTotal' ,4),
+    ('row'      ,1),
+    ('col'      ,1),
+    ('fee'      ,4),
+    ('sdrAmount',4),
+    ('sgrAmount',4),
+    ('ethAmount',4),
+]
+
+
+'''
+    Forward every call to the price band calculator, and keep the SDR amount and the fee of the most recent buy or sell
+'''
+class FeeRecorder():
+    def __init__(self,priceBandCalculator):
+        self.priceBandCalculator = priceBandCalculator
+        self.sdrAmount = 0
+        self.fee       = 0
+    def __getattr__(self,name):
+        return getattr(self.priceBandCalculator,name)
+    def buy(self,_sdrAmount,_sgrTotal,_alpha,_beta):
+        sdrAmountAfterFee = self.priceBandCalculator.buy(_sdrAmount,_sgrTotal,_alpha,_beta)
+        self.sdrAmount = _sdrAmount
+        self.fee       = _sdrAmount-sdrAmountAfterFee
+        return sdrAmountAfterFee
+    def sell(self,_sdrAmount,_sgrTotal,_alpha,_beta):
+        sdrAmountAfterFee = self.priceBandCalculator.sell(_sdrAmount,_sgrTotal,_alpha,_beta)
+        self.sdrAmount = sdrAmountAfterFee
+        self.fee       = _sdrAmount-sdrAmountAfterFee
+        return sdrAmountAfterFee
+
+
+'''
+    Append a row of the state of the system after every operation, and write the rows of every field in chunks
+    The SDR amount of a buy is the model input (before the fee), and the SDR amount of a sell is the model output (after the fee)
+'''
+class StateTrace():
+    def __init__(self,dirName,rows=0,chunkSize=STATE_TRACE_CHUNK):
+        os.makedirs(dirName,exist_ok=True)
+        self.dirName   = dirName
+        self.chunkSize = chunkSize
+        self.rows      = rows
+        self.wideWords = max(WIDE_WORDS,-(-(10**getcontext().prec).bit_length()//(8*WORD_SIZE)))
+        self.fields    = [(name,self.wideWords if words == WIDE_WORDS else words) for name,words in FIELDS]
+        self.chunk     = [bytearray() for name,words in self.fields]
+        self.exponents = [bytearray() for name,words in self.fields if words == self.wideWords]
+        if rows:
+            self.checkManifest()
+        self.fileDescs = [openField(os.path.join(dirName,name+'.bin'),rows*words*WORD_SIZE) for name,words in self.fields]
+        self.expoDescs = [openField(os.path.join(dirName,name+'.exp.bin'),rows*WORD_SIZE) for name,words in self.fields if words == self.wideWords]
+        self.writeManifest()
+    def __enter__(self):
+        return self
+    def __exit__(self,exceptionType,exceptionValue,traceback):
+        self.close()
+    '''
+        Install a fee recorder in the given locator, and keep the components which hold the state of the model
+    '''
+    def attach(self,contractAddressLocator):
+        priceBandCalculator = contractAddressLocator.get('PriceBandCalculator')
+        if not isinstance(priceBandCalculator,FeeRecorder):
+            priceBandCalculator = FeeRecorder(priceBandCalculator)
+            contractAddressLocator.set('PriceBandCalculator',priceBandCalculator)
+        self.feeRecorder = priceBandCalculator
+        self.monetaryModelState = contractAddressLocator.get('MonetaryModelState')
+        self.intervalIterator   = contractAddressLocator.get('IntervalIterator')
+    def record(self,opcode,sgrAmount=0,ethAmount=0):
+        feeRecorder,monetaryModelState,intervalIterator = self.feeRecorder,self.monetaryModelState,self.intervalIterator
+        values = [
+            opcode,
+            monetaryModelState.getSdrTotal(),
+            monetaryModelState.getSgrTotal(),
+            intervalIterator.row,
+            intervalIterator.col,
+            feeRecorder.fee,
+            feeRecorder.sdrAmount,
+            sgrAmount,
+            ethAmount,
+        ]
+        exponents = iter(self.exponents)
+        for chunk,(name,words),value in zip(self.chunk,self.fields,values):
+            if words == self.wideWords:
+                value,exponent = split(value)
+                next(exponents).extend(exponent.to_bytes(WORD_SIZE,'little',signed=True))
+            chunk += value.to_bytes(words*WORD_SIZE,'little')
+        feeRecorder.sdrAmount = 0
+        feeRecorder.fee       = 0
+        self.rows += 1
+        if self.rows % self.chunkSize == 0:
+            self.flush()
+    def flush(self):
+        for chunk,fileDesc in zip(self.chunk+self.exponents,self.fileDescs+self.expoDescs):
+            fileDesc.write(chunk)
+            fileDesc.flush()
+            del chunk[:]
+        self.writeManifest()
+    def close(self):
+        self.flush()
+        for fileDesc in self.fileDescs+self.expoDescs:
+            fileDesc.close()
+    '''
+        Check that the trace to be resumed has the same fields, and holds at least the rows to be kept
+    '''
+    def checkManifest(self):
+        with open(os.path.join(self.dirName,MANIFEST_FILE)) as fileDesc:
+            manifest = load(fileDesc)
+        assert manifest['rows'] >= self.rows,'the state trace holds {} rows instead of {}'.format(manifest['rows'],self.rows)
+        assert [(name,field['words']) for name,field in manifest['fields'].items()] == self.fields,'the state trace has different fields'
+    def writeManifest(self):
+        fields = {}
+        for name,words in self.fields:
+            fields[name] = {'file':name+'.bin','dtype':'<u8','words':words}
+            if words == self.wideWords:
+                fields[name].update({'exponentFile':name+'.exp.bin','exponentDtype':'<i8'})
+        fileName = os.path.join(self.dirName,MANIFEST_FILE)
+        with open(fileName+'.tmp','w') as fileDesc:
+            dump({'rows':self.rows,'fields':fields},fileDesc,indent=4)
+        os.replace(fileName+'.tmp',fileName)
+
+
+'''
+    Open the given file for writing after its first bytes (the given size), discarding all bytes after them
+'''
+def openField(fileName,size):
+    if size == 0:
+        return open(fileName,'wb')
+    fileDesc = open(fileName,'r+b')
+    fileDesc.truncate(size)
+    fileDesc.seek(size)
+    return fileDesc
+
+
+'''
+    Return the given value as (coefficient, exponent), where the coefficient is a non-negative integer
+    A value which is neither an integer nor a decimal (or a negative value) is rejected rather than truncated
+'''
+def split(value):
+    if type(value) is int:
+        return value,0
+    assert isinstance(value,Decimal) and value.is_finite() and value >= 0,'the value {} cannot be stored losslessly'.format(value)
+    sign,digits,exponent = value.as_tuple()
+    return int(''.join(map(str,digits))),exponent
+
+
+'''
+    Yield the values of the given field (the rows counted in the manifest), without loading the entire field into memory
+    A value with a non-zero exponent is yielded as a decimal, and any other value as an integer
+'''
+def read(dirName,name):
+    with open(os.path.join(dirName,MANIFEST_FILE)) as fileDesc:
+        manifest = load(fileDesc)
+    field = manifest['fields'][name]
+    size = field['words']*WORD_SIZE
+    with open(os.path.join(dirName,field['file']),'rb') as fileDesc:
+        if 'exponentFile' not in field:
+            for row in range(manifest['rows']):
+                yield int.from_bytes(fileDesc.read(size),'little')
+            return
+        with open(os.path.join(dirName,field['exponentFile']),'rb') as expoDesc:
+            for row in range(manifest['rows']):
+                value = int.from_bytes(fileDesc.read(size),'little')
+                exponent = int.from_bytes(expoDesc.read(WORD_SIZE),'little',signed=True)
+                yield Decimal((0,tuple(map(int,str(value))),exponent)) if exponent else value
@@ -0,0 +1,63 @@
+from Common.Utils.CommandReader import load
+from Common.Utils.UnitConverter import dec2wei
+
+
+'''
+    Compiled trade script format:
+    - A sequence of records (opcode, elapsed, amount)
+    - The opcode is a single byte, and the elapsed time and the amount are 256-bit big-endian unsigned integers
+    - The amount of a buy or a sell is given in wei, and the amount of an init is the timeout
+'''
+
+
+INIT      = 0
+BUY       = 1
+SELL      = 2
+INFO      = 3
+UNDEFINED = 4
+
+
+OPCODES = {'init':INIT,'buy':BUY,'sell':SELL,'info':INFO}
+
+
+WORD_SIZE   = 32
+RECORD_SIZE = 1+2*WORD_SIZE
+
+
+COMPILED_EXTENSION = '.bin'
+
+
+def encode(command):
+    opcode = OPCODES.get(command['operation'],UNDEFINED)
+    if opcode == INIT:
+        return opcode,0,command['timeout']
+    if opcode in [BUY,SELL]:
+        return opcode,command['elapsed'],dec2wei(command['amount'])
+    return opcode,0,0
+
+
+def write(inputFileName,outputFileName):
+    dump(load(inputFileName),outputFileName)
+
+
+def dump(commands,outputFileName):
+    with open(outputFileName,'wb') as fileDesc:
+        for opcode,elapsed,amount in map(encode,commands):
+            fileDesc.write(bytes([opcode])+elapsed.to_bytes(WORD_SIZE,'big')+amount.to_bytes(WORD_SIZE,'big'))
+
+
+def replay(fileName):
+    with open(fileName,'rb') as fileDesc:
+        record = fileDesc.read(RECORD_SIZE)
+        while record:
+            yield record[0],int.from_bytes(record[1:1+WORD_SIZE],'big'),int.from_bytes(record[1+WORD_SIZE:],'big')
+            record = fileDesc.read(RECORD_SIZE)
+
+
+'''
+    Yield the records of a compiled trade script, or compile the records of any other trade script on the fly
+'''
+def records(fileName):
+    if fileName.endswith(COMPILED_EXTENSION):
+        return replay(fileName)
+    return map(encode,load(fileName))
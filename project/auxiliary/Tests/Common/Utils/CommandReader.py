@@ -1,8 +1,39 @@
 from json import loads
+from gzip import open as gzipOpen
+from lzma import open as lzmaOpen
+
+
+COMPRESSED_FILE_OPENERS = {'.gz':gzipOpen,'.xz':lzmaOpen}
 
 
 def load(fileName):
-    fileDesc = open(fileName)
+    if uncompressedName(fileName).endswith('.jsonl'):
+        return stream(fileName)
+    fileDesc = openFile(fileName)
     fileData = fileDesc.read()
     fileDesc.close()
     return loads(fileData)
+
+
+'''
+    Yield the commands of a JSON Lines file (one command per line) one at a time
+'''
+def stream(fileName):
+    with openFile(fileName) as fileDesc:
+        for line in fileDesc:
+            if line.strip():
+                yield loads(line)
+
+
+def openFile(fileName,mode='r'):
+    for extension,opener in COMPRESSED_FILE_OPENERS.items():
+        if fileName.endswith(extension):
+            return opener(fileName,mode+'t')
+    return open(fileName,mode)
+
+
+def uncompressedName(fileName):
+    for extension in COMPRESSED_FILE_OPENERS:
+        if fileName.endswith(extension):
+            return fileName[:-len(extension)]
+    return fileName
@@ -0,0 +1,160 @@
+import os
+from string import Formatter
+from decimal import Decimal,getcontext
+
+
+'''
+    Trace record format (the same in the ring buffer and in the trace file):
+    - Every record has the same size: the event and the number of values (single bytes), followed by a slot for every value of the widest event
+    - Every value is stored losslessly as coefficient * 10 ^ exponent (the exponent is 0 for every integer value)
+    - The coefficient is an unsigned big-endian integer, and the exponent is a signed big-endian integer of EXPONENT_SIZE bytes
+    - The coefficient holds at least WORD_SIZE bytes, or enough bytes for the coefficient of any decimal at the current precision
+    - Unused slots are zero
+    Trace file format:
+    - A header of two bytes: the number of slots per record and the size of the coefficient
+    - A sequence of records
+'''
+
+
+WORD_SIZE     = 32
+EXPONENT_SIZE = 2
+
+
+TRACE_FILE     = os.getenv('TRACE_FILE','')
+TRACE_CAPACITY = int(os.getenv('TRACE_CAPACITY','4096'))
+
+
+'''
+    A message format along with the conversion of every value before formatting;
+    the first two values of a periodic event are the test count and the number of tests
+'''
+class Event():
+    def __init__(self,format,converter=int,periodic=False):
+        self.format    = format
+        self.converter = converter
+        self.periodic  = periodic
+        self.size      = len([field for text,field,spec,conversion in Formatter().parse(format) if field is not None])+(2 if periodic else 0)
+    def messages(self,values):
+        if self.periodic:
+            values = values[2:]
+        return self.format.format(*map(self.converter,values)).split('\n')
+
+
+'''
+    Record (event, values) as fixed-size records into a preallocated ring buffer, and format them only when they are flushed to the logger;
+    the ring buffer is flushed when it is full, when a periodic event is due, when the recorder is closed, and right before the logger writes any other message
+'''
+class TraceRecorder():
+    def __init__(self,logger,events,fileName=TRACE_FILE,capacity=TRACE_CAPACITY):
+        self.logger    = logger
+        self.events    = events
+        self.debug     = logger.isDebug()
+        self.slots     = max(event.size for event in events)
+        self.coefSize  = max(WORD_SIZE,-(-(10**getcontext().prec).bit_length()//8))
+        self.size      = 2+self.slots*(self.coefSize+EXPONENT_SIZE)
+        self.buffer    = bytearray(capacity*self.size)
+        self.capacity  = capacity
+        self.index     = 0
+        self.count     = 0
+        self.pending   = 0
+        self.fileDesc  = open(fileName,'wb') if fileName else None
+        if self.fileDesc:
+            self.fileDesc.write(bytes([self.slots,self.coefSize]))
+        self.logger.logger.addFilter(self.intercept)
+    def __enter__(self):
+        return self
+    def __exit__(self,exceptionType,exceptionValue,traceback):
+        self.close()
+    def record(self,event,*values):
+        offset = self.index*self.size
+        self.buffer[offset:offset+self.size] = encode(event,values,self.slots,self.coefSize)
+        self.index = (self.index+1) % self.capacity
+        self.pending += 1
+        if self.pending == self.capacity or self.events[event].periodic and values[0] % self.logger.period == 0:
+            self.flush()
+    def flush(self):
+        offsets = self.retained(self.pending)
+        self.count = min(self.count+self.pending,self.capacity)
+        self.pending = 0
+        if self.fileDesc:
+            self.fileDesc.write(b''.join(self.buffer[offset:offset+self.size] for offset in offsets))
+        for offset in offsets:
+            if self.debug or self.events[self.buffer[offset]].periodic:
+                event,values = decode(self.buffer[offset:offset+self.size],self.coefSize)
+                if self.debug or values[0] % self.logger.period == 0:
+                    self.emit(event,values)
+    def close(self):
+        self.flush()
+        self.logger.logger.removeFilter(self.intercept)
+        if self.fileDesc:
+            self.fileDesc.close()
+            self.fileDesc = None
+    def emit(self,event,values):
+        if self.events[event].periodic:
+            for message in self.events[event].messages(values):
+                self.logger.periodic(values[0],values[1],message)
+        else:
+            for message in self.events[event].messages(values):
+                self.logger.debug(message)
+    '''
+        Flush the pending records before the logger writes a message of its own, so that all messages are written in the order of their occurrence
+        The messages emitted by 'flush' pass here too, when there are no pending records left
+    '''
+    def intercept(self,logRecord):
+        if self.pending:
+            self.flush()
+        return True
+    '''
+        Format the most recent records on demand, regardless of the log level
+    '''
+    def messages(self):
+        self.flush()
+        for offset in self.retained(self.count):
+            event,values = decode(self.buffer[offset:offset+self.size],self.coefSize)
+            yield from self.events[event].messages(values)
+    def retained(self,count):
+        return [(self.index-count+n) % self.capacity*self.size for n in range(count)]
+
+
+'''
+    Return the given value as (coefficient, exponent), where the coefficient is a non-negative integer
+    A value which is neither an integer nor a decimal (or a negative value) is rejected rather than truncated
+'''
+def split(value):
+    if type(value) is int:
+        return value,0
+    assert isinstance(value,Decimal) and value.is_finite() and value >= 0,'the value {} cannot be recorded losslessly'.format(value)
+    sign,digits,exponent = value.as_tuple()
+    return int(''.join(map(str,digits))),exponent
+
+
+def encode(event,values,slots,coefSize):
+    assert len(values) <= slots
+    data = [bytes([event,len(values)])]
+    for value in values:
+        coefficient,exponent = split(value)
+        data += [coefficient.to_bytes(coefSize,'big'),exponent.to_bytes(EXPONENT_SIZE,'big',signed=True)]
+    data.append(bytes((slots-len(values))*(coefSize+EXPONENT_SIZE)))
+    return b''.join(data)
+
+
+'''
+    Return the event and the values of the given record, where a value with a non-zero exponent is returned as a decimal
+'''
+def decode(data,coefSize):
+    values = []
+    for offset in range(2,2+data[1]*(coefSize+EXPONENT_SIZE),coefSize+EXPONENT_SIZE):
+        coefficient = int.from_bytes(data[offset:offset+coefSize],'big')
+        exponent = int.from_bytes(data[offset+coefSize:offset+coefSize+EXPONENT_SIZE],'big',signed=True)
+        values.append(Decimal((0,tuple(map(int,str(coefficient))),exponent)) if exponent else coefficient)
+    return data[0],tuple(values)
+
+
+def replay(fileName):
+    with open(fileName,'rb') as fileDesc:
+        slots,coefSize = fileDesc.read(2)
+        size = 2+slots*(coefSize+EXPONENT_SIZE)
+        data = fileDesc.read(size)
+        while data:
+            yield decode(data,coefSize)
+            data = fileDesc.read(size)
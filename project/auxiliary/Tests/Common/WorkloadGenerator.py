@@ -0,0 +1,109 @@
+from json import dumps
+from random import Random
+from decimal import Decimal
+from ModelCalculator import FixedPoint as modelCalculator
+from PriceBandCalculator import FixedPoint as priceBandCalculator
+from ReconciliationAdjuster.FixedPoint import ReconciliationAdjuster
+from ETHConverter.FixedPoint import ETHConverter
+from Common.SGRTokenTradePython import init
+from Common.Utils.UnitConverter import dec2wei
+from Common.Utils.UnitConverter import wei2dec
+from Common.Utils.CommandReader import openFile
+from Common.Utils.CommandCompiler import dump
+from Common.Utils.CommandCompiler import COMPILED_EXTENSION
+
+
+'''
+    Arrival processes - yield the elapsed time (in seconds) before every command
+'''
+
+
+def poissonArrivals(rnd,rate):
+    while True:
+        yield int(rnd.expovariate(rate))
+
+
+def burstyArrivals(rnd,burstRate,idleRate,meanBurstLength):
+    while True:
+        yield int(rnd.expovariate(idleRate if rnd.random() < 1/meanBurstLength else burstRate))
+
+
+'''
+    Add the timeout to some of the elapsed times, so that the minting point timers expire in between commands
+'''
+def timeoutCrossings(rnd,arrivals,timeout,probability):
+    for elapsed in arrivals:
+        yield elapsed+timeout+1 if rnd.random() < probability else elapsed
+
+
+'''
+    Size distributions - yield the amount of every command
+'''
+
+
+def logNormalSizes(rnd,mu,sigma):
+    while True:
+        yield rnd.lognormvariate(mu,sigma)
+
+
+def paretoSizes(rnd,alpha,scale):
+    while True:
+        yield rnd.paretovariate(alpha)*scale
+
+
+'''
+    Yield an init command followed by the given number of buy and sell commands
+    Every command is applied to a shadow emulation of the token, so that the script never exceeds the model bounds:
+    - A buy is quoted before it is applied, and replaced with a sell if it would be rejected (by the model bounds or by the transaction limiter)
+    - A sell is limited to a portion of the supply at that point
+'''
+def generate(rnd,count,timeout,arrivals,sizes,buyRatio,sellRatio,mintingPointTimersManager,sgrToken):
+    yield {'operation':'init','timeout':timeout}
+    for n,elapsed,size in zip(range(count),arrivals,sizes):
+        mintingPointTimersManager.now += elapsed
+        if rnd.random() < buyRatio:
+            amount = '{:.2f}'.format(size)
+            try:
+                sgrToken.quoteBuy(dec2wei(amount))
+                sgrToken.buy(dec2wei(amount))
+                yield {'operation':'buy','elapsed':elapsed,'amount':amount}
+                continue
+            except (AssertionError,IndexError):
+                pass
+        amount = '{:.2f}'.format(min(Decimal(size),wei2dec(sgrToken.sgrTotal)*Decimal(sellRatio)))
+        sgrToken.sell(dec2wei(amount))
+        yield {'operation':'sell','elapsed':elapsed,'amount':amount}
+
+
+'''
+    Return the elapsed times and the amounts of the commands, drawn from the given random generator
+'''
+def createSources(rnd,timeout,arrival,size,crossingProbability):
+    arrivals = {
+        'poisson':lambda: poissonArrivals(rnd,0.5),
+        'bursty' :lambda: burstyArrivals(rnd,5.0,0.001,100),
+    }[arrival]()
+    sizes = {
+        'lognormal':lambda: logNormalSizes(rnd,10,2),
+        'pareto'   :lambda: paretoSizes(rnd,1.2,1000),
+    }[size]()
+    return timeoutCrossings(rnd,arrivals,timeout,crossingProbability),sizes
+
+
+def create(logger,seed,count,timeout,arrival,size,buyRatio=0.6,sellRatio=0.5,crossingProbability=0.01):
+    rnd = Random(seed)
+    arrivals,sizes = createSources(rnd,timeout,arrival,size,crossingProbability)
+    mintingPointTimersManager,sgrToken = init(logger,modelCalculator,priceBandCalculator,ReconciliationAdjuster,ETHConverter,timeout)
+    return generate(rnd,count,timeout,arrivals,sizes,buyRatio,sellRatio,mintingPointTimersManager,sgrToken)
+
+
+'''
+    Write the commands as JSON Lines (optionally compressed), or as a compiled script
+'''
+def write(fileName,commands):
+    if fileName.endswith(COMPILED_EXTENSION):
+        dump(commands,fileName)
+    else:
+        with openFile(fileName,'w') as fileDesc:
+            for command in commands:
+                fileDesc.write(dumps(command)+'\n')
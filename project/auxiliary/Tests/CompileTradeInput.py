@@ -0,0 +1,11 @@
+import Config
+
+
+from sys import argv
+from Common.Utils.CommandCompiler import write
+from Common.Utils.CommandCompiler import COMPILED_EXTENSION
+
+
+inputFileName  = argv[1] if len(argv) > 1 else 'TradeInputExample.json'
+outputFileName = argv[2] if len(argv) > 2 else inputFileName+COMPILED_EXTENSION
+write(inputFileName,outputFileName)
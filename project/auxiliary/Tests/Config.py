@@ -37,6 +37,8 @@ class Logger():
         streamHandler.setLevel(level)
         self.logger.addHandler(streamHandler)
         self.logger.setLevel(level)
+    def isDebug(self):
+        return self.logger.isEnabledFor(logging.DEBUG)
     def periodic(self,testCount,numOfTests,message):
         func = self.debug if testCount % self.period else self.info
         func('Test {} out of {}: {}'.format(testCount,numOfTests,message))
@@ -0,0 +1,13 @@
+import Config
+
+
+from os import getenv
+from sys import argv
+from Common.WorkloadGenerator import create
+from Common.WorkloadGenerator import write
+
+
+fileName = argv[1] if len(argv) > 1 else 'TradeInputGenerated.jsonl'
+count    = int(argv[2]) if len(argv) > 2 else 1000000
+seed     = int(argv[3]) if len(argv) > 3 else 0
+write(fileName,create(Config.Logger(),seed,count,int(getenv('WORKLOAD_TIMEOUT','10')),getenv('WORKLOAD_ARRIVAL','poisson'),getenv('WORKLOAD_SIZE','lognormal')))
@@ -0,0 +1,10 @@
+import Config
+
+
+from Common.Utils.UserInput import read
+from Common.MonetaryModelRestorePython import run
+from ModelCalculator import FixedPoint as modelCalculator
+from PriceBandCalculator import FixedPoint as priceBandCalculator
+
+
+run(read(default='TradeInputExample.json'),Config.Logger(),modelCalculator,priceBandCalculator)
\ No newline at end of file
@@ -1,4 +1,8 @@
+from os import getenv
+from os.path import join,exists
 from sys import path
+from shutil import copytree,rmtree
+from tempfile import mkdtemp
 from subprocess import run
 
 port     = 8545
@@ -6,12 +10,28 @@ gasPrice = 1
 gasLimit = 2**53-1
 privKey  = 1
 balance  = 2**256-1
+fixture  = getenv('GANACHE_FIXTURE','')
 
-run([
+args = [
     'node',
     '{}/../../../node_modules/ganache-cli/cli.js'.format(path[0]),
     '--port={}'.format(port),
     '--gasPrice={}'.format(gasPrice),
     '--gasLimit={}'.format(gasLimit),
     '--account={0:#0{1}x},{2}'.format(privKey,65,balance)
-])
\ No newline at end of file
+]
+
+# build the fixture database in place, or run on a temporary copy of the fixture database once its manifest exists (see 'BuildGanacheFixture.py')
+tempDir = None
+if fixture:
+    db = join(fixture,'db')
+    if exists(join(fixture,'manifest.json')):
+        tempDir = mkdtemp()
+        db = copytree(db,join(tempDir,'db'))
+    args.append('--db={}'.format(db))
+
+try:
+    run(args)
+finally:
+    if tempDir:
+        rmtree(tempDir)
\ No newline at end of file
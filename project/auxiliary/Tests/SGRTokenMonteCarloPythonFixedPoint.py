@@ -0,0 +1,12 @@
+import Config
+
+
+from Common.Utils.UserInput import read
+from Common.SGRTokenMonteCarloPython import run
+from ModelCalculator import FixedPoint as modelCalculator
+from PriceBandCalculator import FixedPoint as priceBandCalculator
+from ReconciliationAdjuster.FixedPoint import ReconciliationAdjuster
+from ETHConverter.FixedPoint import ETHConverter
+
+
+run(read(default='MonteCarloInputExample.json'),Config.Logger(),modelCalculator,priceBandCalculator,ReconciliationAdjuster,ETHConverter)